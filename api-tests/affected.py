@@ -0,0 +1,144 @@
+"""
+Affected-test selection
+Maps changed controller files to the tests that cover them: generated modules
+through the catalogue's file_name -> test_file entries, hand-written suites
+through the REST paths they call. Changes to the harness or the generator
+select everything; changed test files select themselves. A changed controller
+the catalogue does not know (new, renamed, or a catalogue older than the
+change) selects everything too.
+
+With --base, controllers are diffed in the WordPress checkout (--repo, by
+default the git repository around test_generator.WORDPRESS_ENDPOINTS_DIR) and
+the harness and suites in this repository.
+
+Usage:
+    python api-tests/affected.py --base origin/main              # print the affected test files
+    python api-tests/affected.py --base origin/trunk --repo ~/src/wordpress-develop
+    python api-tests/affected.py --files class-wp-rest-posts-controller.php --run -- -x
+    pytest $(python api-tests/affected.py --base origin/main)
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from catalogue import load_catalogue
+from test_generator import WORDPRESS_ENDPOINTS_DIR
+
+HERE = Path(__file__).parent
+GENERATED_DIR = HERE / "generated"
+# Files every test depends on: a change here selects the whole suite
+HARNESS_FILES = frozenset({
+    "conftest.py", "config.py", "wp_runtime.py", "http_cache.py", "health.py", "sharding.py",
+    "batch.py", "seeder.py", "artifacts.py", "snapshots.py", "cassettes.py", "catalogue.py",
+    "streaming.py", "resources.py",
+})
+# REST paths in hand-written suites, e.g. f"{BASE_URL}/wp/v2/users/{USER_ID}/application-passwords"
+SUITE_PATH_RE = re.compile(r"""["'][^"'\n]*?(/[a-z0-9-]+/v\d+(?:/[^"'?\s]*)?)""")
+
+
+def changed_files(base: str, cwd: Path = HERE) -> List[str]:
+    """Files changed since the merge base with base, plus uncommitted changes"""
+    files: Set[str] = set()
+    for args in (["git", "diff", "--name-only", f"{base}...HEAD"], ["git", "diff", "--name-only", "HEAD"]):
+        result = subprocess.run(args, cwd=cwd, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip() or f"{' '.join(args)} failed")
+        files.update(line.strip() for line in result.stdout.splitlines() if line.strip())
+    return sorted(files)
+
+
+def git_root(path: Path) -> Optional[Path]:
+    """Top of the git checkout containing path, None when there is none"""
+    try:
+        result = subprocess.run(["git", "rev-parse", "--show-toplevel"], cwd=path, capture_output=True, text=True)
+    except OSError:
+        return None
+    return Path(result.stdout.strip()) if result.returncode == 0 else None
+
+
+def hand_written_suites() -> List[Path]:
+    return sorted(HERE.glob("test_*_api.py"))
+
+
+def suite_paths(path: Path) -> Set[str]:
+    """REST paths a hand-written suite requests, with f-string fields as placeholders"""
+    text = path.read_text(encoding="utf-8")
+    return {re.sub(r"\{\w+\}", "1", match.rstrip("/")) for match in SUITE_PATH_RE.findall(text)}
+
+
+def route_regex(path: str) -> re.Pattern:
+    parts = re.split(r"\{\w+\}", path.rstrip("/"))
+    return re.compile("^" + ".+?".join(re.escape(part) for part in parts) + "$")
+
+
+def affected_tests(changed: Iterable[str], entries: Optional[List[Dict]] = None) -> List[Path]:
+    """Test files to run for a set of changed files (repository-relative or bare names)"""
+    entries = load_catalogue() if entries is None else entries
+    changed = [Path(name) for name in changed]
+    everything = sorted(GENERATED_DIR.glob("test_*.py")) + hand_written_suites()
+    selected: Set[Path] = set()
+    endpoint_paths: Set[str] = set()
+
+    for path in changed:
+        if path.name in HARNESS_FILES:
+            return everything
+        if path.name == "test_generator.py":
+            selected.update(GENERATED_DIR.glob("test_*.py"))
+        elif path.suffix == ".py" and path.name.startswith("test_"):
+            candidate = HERE / path.name if (HERE / path.name).exists() else GENERATED_DIR / path.name
+            if candidate.exists():
+                selected.add(candidate)
+        elif path.suffix == ".php":
+            matches = [entry for entry in entries if entry.get("file_name") == path.name]
+            if not matches:
+                # No catalogue entry to map through: running everything is the safe answer
+                return everything
+            for entry in matches:
+                endpoint_paths.add(entry["path"])
+                selected.add(GENERATED_DIR / entry["test_file"])
+
+    if endpoint_paths:
+        patterns = [route_regex(path) for path in endpoint_paths]
+        for suite in hand_written_suites():
+            if any(pattern.match(path) for path in suite_paths(suite) for pattern in patterns):
+                selected.add(suite)
+    return sorted(path for path in selected if path.exists())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Select the tests affected by changed controllers")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--base", help="git ref to diff against, e.g. origin/main")
+    source.add_argument("--files", nargs="+", help="changed files (controller .php names or paths)")
+    parser.add_argument("--repo", type=Path,
+                        help="WordPress checkout to diff controllers in (default: the git repository "
+                             "around WORDPRESS_ENDPOINTS_DIR)")
+    parser.add_argument("--run", action="store_true", help="run pytest on the selection")
+    parser.add_argument("pytest_args", nargs="*", help="extra pytest arguments after --")
+    args = parser.parse_args()
+
+    if args.base:
+        repo = args.repo or git_root(WORDPRESS_ENDPOINTS_DIR)
+        if repo is None:
+            parser.error(f"no git checkout at {WORDPRESS_ENDPOINTS_DIR}; pass the WordPress checkout with --repo")
+        changed = sorted(set(changed_files(args.base)) | set(changed_files(args.base, repo)))
+    else:
+        changed = args.files
+    selected = affected_tests(changed)
+    total = len(list(GENERATED_DIR.glob("test_*.py"))) + len(hand_written_suites())
+    print(f"{len(selected)} of {total} test files affected by {len(changed)} changed files", file=sys.stderr)
+    if not args.run:
+        for path in selected:
+            print(path)
+        return 0
+    if not selected:
+        return 0
+    return subprocess.run([sys.executable, "-m", "pytest", *map(str, selected), *args.pytest_args]).returncode
+
+
+if __name__ == "__main__":
+    sys.exit(main())
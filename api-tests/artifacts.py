@@ -0,0 +1,342 @@
+"""
+Content-addressed store for saved API responses
+Each distinct response body is written once under blobs/<sha256>, and
+index.json maps "<suite>_outputs/<name>.json" to the blob it currently holds.
+Re-runs that get identical responses write no new blobs. When an artifact
+changes, its entry keeps the blob it replaced, which is what snapshots.py diffs.
+Large bodies can be written in chunks (open_blob/put_stream) without ever
+being held in memory whole.
+
+Usage:
+    python api-tests/artifacts.py stats
+    python api-tests/artifacts.py export api-tests/screenshots   # old one-file-per-test layout
+    python api-tests/artifacts.py gc                             # drop unreferenced blobs
+"""
+
+import argparse
+import atexit
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+ARTIFACTS_DIR = Path(__file__).parent / "artifacts"
+LOCK_TIMEOUT = 30.0
+# Headers that differ on every response; left out of error dumps so identical re-runs share a blob
+VOLATILE_HEADERS = frozenset({
+    "date", "expires", "age", "set-cookie", "x-request-id", "x-wp-nonce",
+    "cf-ray", "x-runtime", "connection", "keep-alive",
+})
+
+
+class IndexLock:
+    """Cross-process lock on index.json (pytest-xdist workers flush concurrently)"""
+
+    def __init__(self, path: Path, timeout: float = LOCK_TIMEOUT):
+        self.path = path
+        self.timeout = timeout
+
+    def __enter__(self):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                os.close(os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return self
+            except FileExistsError:
+                # A crashed run can leave the lock behind
+                try:
+                    if time.time() - self.path.stat().st_mtime > self.timeout:
+                        self.path.unlink()
+                        continue
+                except FileNotFoundError:
+                    continue
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Could not lock {self.path}")
+                time.sleep(0.05)
+
+    def __exit__(self, *exc):
+        self.path.unlink(missing_ok=True)
+
+
+class BlobWriter:
+    """A blob written in chunks: hashed and spooled to a temp file, stored on commit()
+
+    Used as a context manager; a writer left uncommitted is discarded on exit.
+    """
+
+    def __init__(self, store: "ArtifactStore"):
+        self.store = store
+        self.size = 0
+        self.digest: Optional[str] = None
+        self._hash = hashlib.sha256()
+        tmp_dir = store.root / "tmp"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        self._file = tempfile.NamedTemporaryFile(dir=tmp_dir, suffix=".tmp", delete=False)
+
+    def write(self, chunk: bytes) -> None:
+        self._hash.update(chunk)
+        self._file.write(chunk)
+        self.size += len(chunk)
+
+    def commit(self) -> str:
+        """Move the written data into the store; returns its digest"""
+        self._file.close()
+        self.digest = self._hash.hexdigest()
+        self.store._add_blob_file(self.digest, Path(self._file.name), self.size)
+        return self.digest
+
+    def abort(self) -> None:
+        self._file.close()
+        Path(self._file.name).unlink(missing_ok=True)
+
+    def __enter__(self) -> "BlobWriter":
+        return self
+
+    def __exit__(self, *exc):
+        if self.digest is None:
+            self.abort()
+
+
+class ArtifactStore:
+    """Blobs keyed by SHA-256 plus an index from artifact name to blob"""
+
+    def __init__(self, root: Path = ARTIFACTS_DIR):
+        self.root = root
+        self.blob_dir = root / "blobs"
+        self.index_path = root / "index.json"
+        self._index: Optional[Dict[str, Dict[str, Any]]] = None
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.saved = 0
+        self.blobs_written = 0
+        self.bytes_written = 0
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                return json.load(f).get("entries", {})
+        except (OSError, ValueError):
+            return {}
+
+    @property
+    def index(self) -> Dict[str, Dict[str, Any]]:
+        if self._index is None:
+            self._index = self._load_index()
+        return self._index
+
+    def blob_path(self, digest: str) -> Path:
+        return self.blob_dir / digest[:2] / digest
+
+    def put_blob(self, data: bytes) -> str:
+        """Store data without an index entry; returns its digest"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.blob_path(digest)
+        with self._lock:
+            if not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_name(f"{digest}.{os.getpid()}.{threading.get_ident()}.tmp")
+                tmp_path.write_bytes(data)
+                tmp_path.replace(path)
+                self.blobs_written += 1
+                self.bytes_written += len(data)
+        return digest
+
+    def _add_blob_file(self, digest: str, tmp_path: Path, size: int) -> None:
+        path = self.blob_path(digest)
+        with self._lock:
+            if path.exists():
+                tmp_path.unlink()
+                return
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.replace(path)
+            self.blobs_written += 1
+            self.bytes_written += size
+
+    def open_blob(self) -> BlobWriter:
+        """A writer for a blob too large to pass to put_blob() in one piece"""
+        return BlobWriter(self)
+
+    def put(self, key: str, data: bytes) -> str:
+        """Store data under key; returns its digest"""
+        return self.link(key, self.put_blob(data), len(data))
+
+    def put_stream(self, key: str, chunks: Iterable[bytes]) -> str:
+        """Store the concatenated chunks under key, one chunk in memory at a time; returns the digest"""
+        with self.open_blob() as blob:
+            for chunk in chunks:
+                blob.write(chunk)
+            return self.link(key, blob.commit(), blob.size)
+
+    def link(self, key: str, digest: str, size: int) -> str:
+        """Point key at a blob already in the store; returns the digest"""
+        with self._lock:
+            self.saved += 1
+            stored = self.index.get(key)
+            if stored is not None and stored["blob"] == digest:
+                # Back to what the last run saved
+                self._pending.pop(key, None)
+            elif key not in self._pending or self._pending[key]["blob"] != digest:
+                self._pending[key] = {
+                    "blob": digest,
+                    "size": size,
+                    "updated": time.time(),
+                    "previous": stored["blob"] if stored else None,
+                }
+        return digest
+
+    def changed(self) -> Dict[str, Dict[str, Any]]:
+        """Entries this process saved with a different body than the index holds"""
+        with self._lock:
+            return dict(self._pending)
+
+    def read_blob(self, digest: Optional[str]) -> Optional[bytes]:
+        if not digest:
+            return None
+        try:
+            return self.blob_path(digest).read_bytes()
+        except OSError:
+            return None
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self._pending.get(key) or self.index.get(key)
+        return self.read_blob(entry["blob"]) if entry else None
+
+    def flush(self) -> int:
+        """Merge this process's index changes into index.json; returns entries updated"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        self.root.mkdir(parents=True, exist_ok=True)
+        with IndexLock(self.root / "index.lock"):
+            # Re-read: other workers may have flushed since we loaded it
+            entries = self._load_index()
+            entries.update(pending)
+            tmp_path = self.index_path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": 1, "entries": dict(sorted(entries.items()))}, f, indent=1)
+            tmp_path.replace(self.index_path)
+        self._index = entries
+        return len(pending)
+
+    def export(self, destination: Path) -> int:
+        """Write every indexed artifact as a plain file, e.g. back into screenshots/"""
+        count = 0
+        for key, entry in self.index.items():
+            target = destination / key
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(self.blob_path(entry["blob"]).read_bytes())
+            count += 1
+        return count
+
+    def gc(self) -> int:
+        """Delete blobs no index entry points to (as current or previous); returns blobs removed"""
+        live = {entry["blob"] for entry in self.index.values()}
+        live.update(entry["previous"] for entry in self.index.values() if entry.get("previous"))
+        removed = 0
+        for path in self.blob_dir.glob("*/*"):
+            if path.name not in live:
+                path.unlink()
+                removed += 1
+        return removed
+
+    def counts(self) -> Dict[str, int]:
+        return {"saved": self.saved, "blobs_written": self.blobs_written, "bytes_written": self.bytes_written}
+
+    def merge(self, counts: Dict[str, int]) -> None:
+        """Add a pytest-xdist worker's counts to this store's"""
+        with self._lock:
+            self.saved += counts.get("saved", 0)
+            self.blobs_written += counts.get("blobs_written", 0)
+            self.bytes_written += counts.get("bytes_written", 0)
+
+    def summary(self) -> str:
+        return (f"{self.saved} saved, {self.blobs_written} new blobs "
+                f"({self.bytes_written / 1024:.1f}KB written), "
+                f"{self.saved - self.blobs_written} deduplicated")
+
+
+_store: Optional[ArtifactStore] = None
+_store_lock = threading.Lock()
+
+
+def default_store() -> ArtifactStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ArtifactStore()
+            atexit.register(_store.flush)
+        return _store
+
+
+def _encode(content: Any, indent: int) -> bytes:
+    if isinstance(content, bytes):
+        return content
+    if isinstance(content, str):
+        return content.encode("utf-8")
+    return json.dumps(content, indent=indent).encode("utf-8")
+
+
+def save_artifact(directory: str, name: str, content: Any, indent: int = 4) -> str:
+    """Save bytes, text or a JSON-serialisable object as <directory>/<name>; returns the key"""
+    key = f"{directory}/{name}"
+    default_store().put(key, _encode(content, indent))
+    return key
+
+
+def render_response(response) -> str:
+    """The format generated tests have always written: pretty JSON for 2xx, a status dump otherwise
+
+    The dump leaves out VOLATILE_HEADERS.
+    """
+    try:
+        if 200 <= response.status_code < 300:
+            try:
+                return json.dumps(response.json(), indent=4)
+            except ValueError:
+                return response.text
+        try:
+            body = response.text
+        except Exception:
+            body = "[Unable to read response body]"
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in VOLATILE_HEADERS}
+        return f"Status: {response.status_code}\nHeaders: {headers}\nBody: {body}"
+    except Exception as e:
+        return f"Error saving response: {str(e)}\nStatus Code: {getattr(response, 'status_code', 'N/A')}\n"
+
+
+def save_response(directory: str, name: str, response) -> str:
+    """Save a response under <directory>/<name>.json in the generated-test format"""
+    return save_artifact(directory, f"{name}.json", render_response(response))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect the response artifact store")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats")
+    export = sub.add_parser("export")
+    export.add_argument("destination", type=Path)
+    sub.add_parser("gc")
+    args = parser.parse_args()
+
+    store = ArtifactStore()
+    if args.command == "stats":
+        blobs = list(store.blob_dir.glob("*/*"))
+        logical = sum(entry["size"] for entry in store.index.values())
+        stored = sum(path.stat().st_size for path in blobs)
+        print(f"{len(store.index)} artifacts in {len(blobs)} blobs: "
+              f"{logical / 1024:.1f}KB logical, {stored / 1024:.1f}KB on disk")
+    elif args.command == "export":
+        print(f"Exported {store.export(args.destination)} artifacts to {args.destination}")
+    elif args.command == "gc":
+        print(f"Removed {store.gc()} unreferenced blobs")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+"""
+Client for the WordPress /batch/v1 endpoint
+Queued write operations are sent up to 25 at a time in a single HTTP call and
+each caller gets its own sub-response back. Operations on routes that have not
+opted in to batching are sent one request each.
+"""
+
+import threading
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.auth import HTTPBasicAuth
+
+from config import APP_PASSWORD, BASE_URL, USERNAME
+
+# WordPress default for the rest_get_max_batch_size filter
+MAX_BATCH_SIZE = 25
+BATCH_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+
+
+class BatchError(Exception):
+    """The batch call itself failed, so none of its sub-requests have a result"""
+
+    def __init__(self, message: str, response=None):
+        super().__init__(message)
+        self.response = response
+
+
+class BatchResponse:
+    """One sub-response, shaped like the bits of requests.Response the suites use"""
+
+    def __init__(self, status_code: int, body: Any, headers: Optional[Dict[str, str]] = None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers or {}
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status_code < 400
+
+    def json(self) -> Any:
+        return self.body
+
+    def __repr__(self) -> str:
+        return f"<BatchResponse [{self.status_code}]>"
+
+
+class BatchFuture:
+    """Result of a queued operation; result() sends the pending batch if needed"""
+
+    def __init__(self, client: "BatchClient", method: str, path: str, body: Any, headers: Dict[str, str]):
+        self.client = client
+        self.method = method
+        self.path = path
+        self.body = body
+        self.headers = headers
+        self._response: Optional[BatchResponse] = None
+        self._error: Optional[Exception] = None
+
+    def done(self) -> bool:
+        return self._response is not None or self._error is not None
+
+    def result(self) -> BatchResponse:
+        if not self.done():
+            self.client.flush()
+        if self._error is not None:
+            raise self._error
+        return self._response
+
+    def _set_response(self, response: BatchResponse) -> None:
+        self._response = response
+
+    def _set_error(self, error: Exception) -> None:
+        self._error = error
+
+
+class BatchClient:
+    """Coalesces write requests into /batch/v1 calls
+
+    Usage:
+        with BatchClient() as batch:
+            futures = [batch.post("/wp/v2/posts", {"title": f"Post {i}"}) for i in range(50)]
+        ids = [f.result().json()["id"] for f in futures]
+
+    Sub-requests refused with rest_batch_not_allowed are resent one at a time;
+    with resend_not_allowed=False the refusal is returned instead, for callers
+    that have a faster fallback of their own.
+    """
+
+    def __init__(self, base_url: str = BASE_URL, auth=None, max_batch: int = MAX_BATCH_SIZE,
+                 validation: str = "normal", timeout: float = 30, resend_not_allowed: bool = True):
+        self.base_url = base_url.rstrip("/")
+        self.auth = auth if auth is not None else HTTPBasicAuth(USERNAME, APP_PASSWORD)
+        self.max_batch = max(1, min(max_batch, MAX_BATCH_SIZE))
+        self.validation = validation
+        self.timeout = timeout
+        self.resend_not_allowed = resend_not_allowed
+        self.round_trips = 0
+        self.batch_supported = True
+        self._pending: List[BatchFuture] = []
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "BatchClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.flush()
+
+    def queue(self, method: str, path: str, body: Any = None,
+              headers: Optional[Dict[str, str]] = None) -> BatchFuture:
+        """Queue a write; a full batch is sent straight away"""
+        method = method.upper()
+        if method not in BATCH_METHODS:
+            raise ValueError(f"{method} cannot be batched, only {', '.join(BATCH_METHODS)}")
+        future = BatchFuture(self, method, self._route(path), body, headers or {})
+        with self._lock:
+            self._pending.append(future)
+            full = len(self._pending) >= self.max_batch
+        if full:
+            self.flush()
+        return future
+
+    def post(self, path: str, body: Any = None, **kwargs) -> BatchFuture:
+        return self.queue("POST", path, body, **kwargs)
+
+    def put(self, path: str, body: Any = None, **kwargs) -> BatchFuture:
+        return self.queue("PUT", path, body, **kwargs)
+
+    def patch(self, path: str, body: Any = None, **kwargs) -> BatchFuture:
+        return self.queue("PATCH", path, body, **kwargs)
+
+    def delete(self, path: str, body: Any = None, **kwargs) -> BatchFuture:
+        return self.queue("DELETE", path, body, **kwargs)
+
+    def flush(self) -> None:
+        """Send everything queued so far"""
+        while True:
+            with self._lock:
+                chunk = self._pending[:self.max_batch]
+                del self._pending[:self.max_batch]
+            if not chunk:
+                return
+            try:
+                if self.batch_supported:
+                    self._send_batch(chunk)
+                else:
+                    self._send_each(chunk)
+            except requests.exceptions.RequestException as e:
+                for future in chunk:
+                    if not future.done():
+                        future._set_error(e)
+
+    def _route(self, path: str) -> str:
+        """Batch paths are relative to the REST root, e.g. /wp/v2/posts"""
+        if path.startswith(self.base_url):
+            path = path[len(self.base_url):]
+        elif "://" in path:
+            path = urlsplit(path).path
+        return "/" + path.lstrip("/")
+
+    def _send_batch(self, chunk: List[BatchFuture]) -> None:
+        payload = {
+            "validation": self.validation,
+            "requests": [
+                {"method": f.method, "path": f.path, "body": f.body, "headers": f.headers}
+                if f.body is not None else
+                {"method": f.method, "path": f.path, "headers": f.headers}
+                for f in chunk
+            ],
+        }
+        response = requests.post(f"{self.base_url}/batch/v1", json=payload, auth=self.auth, timeout=self.timeout)
+        self.round_trips += 1
+
+        # Sites older than WordPress 5.6 have no batch endpoint
+        if response.status_code == 404:
+            self.batch_supported = False
+            self._send_each(chunk)
+            return
+
+        try:
+            data = response.json()
+        except ValueError:
+            data = None
+        responses = data.get("responses") if isinstance(data, dict) else None
+        if not isinstance(responses, list):
+            error = BatchError(f"Batch request failed with {response.status_code}", response)
+            for future in chunk:
+                future._set_error(error)
+            return
+
+        # With require-all-validate a validation failure returns errors for every item
+        not_allowed = []
+        for future, item in zip(chunk, responses):
+            body = item.get("body")
+            if (self.resend_not_allowed and isinstance(body, dict)
+                    and body.get("code") == "rest_batch_not_allowed"):
+                not_allowed.append(future)
+            else:
+                future._set_response(BatchResponse(item.get("status", 500), body, item.get("headers")))
+        for future in chunk[len(responses):]:
+            future._set_error(BatchError("No sub-response returned for this request", response))
+        if not_allowed:
+            self._send_each(not_allowed)
+
+    def _send_each(self, chunk: List[BatchFuture]) -> None:
+        for future in chunk:
+            response = requests.request(
+                future.method,
+                f"{self.base_url}{future.path}",
+                json=future.body,
+                headers=future.headers or None,
+                auth=self.auth,
+                timeout=self.timeout,
+            )
+            self.round_trips += 1
+            try:
+                body = response.json()
+            except ValueError:
+                body = response.text
+            future._set_response(BatchResponse(response.status_code, body, dict(response.headers)))
@@ -0,0 +1,286 @@
+"""
+Client-side throughput benchmark of the test harness
+Runs the request/decode/save/assert loop of a generated test against the local
+mock server (mock_server.py, started in its own process) and reports how many
+requests per second the harness can drive and where the time per request
+goes. Client patterns compared:
+
+    per-call   requests.get() with a new connection per call (what the suites did originally)
+    pooled     one keep-alive requests.Session
+    runtime    the shared wp_runtime session (governor, retries, transfer accounting)
+    threads    a pooled session shared by --concurrency threads
+    async      aiohttp with --concurrency tasks (only when aiohttp is installed)
+
+With --suite the generated suite itself is run against the mock server too.
+
+Usage:
+    python api-tests/bench_harness.py
+    python api-tests/bench_harness.py --requests 5000 --concurrency 16 --suite
+"""
+
+import argparse
+import asyncio
+import json
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import requests
+from requests.auth import HTTPBasicAuth
+
+try:
+    import aiohttp
+except ImportError:  # optional: the async pattern is skipped without it
+    aiohttp = None
+
+import wp_runtime
+from artifacts import ArtifactStore, render_response
+
+HERE = Path(__file__).parent
+RESULTS_DIR = HERE / "bench"
+STAGES = ("request", "decode", "save", "assert")
+AUTH = ("bench", "bench-password")
+PATH = "/wp/v2/posts"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_mock_server(port: int, items: int) -> subprocess.Popen:
+    """Mock server in a separate process, so its CPU time is not charged to the client"""
+    process = subprocess.Popen(
+        [sys.executable, str(HERE / "mock_server.py"), "--port", str(port), "--items", str(items)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return process
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError(f"mock server did not start on port {port}")
+
+
+class StageTimer:
+    """Wall time per harness stage, summed over every request (thread-safe)"""
+
+    def __init__(self):
+        self.totals = dict.fromkeys(STAGES, 0.0)
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def add(self, timings: Dict[str, float]) -> None:
+        with self._lock:
+            self.count += 1
+            for stage, seconds in timings.items():
+                self.totals[stage] += seconds
+
+    def per_request_us(self) -> Dict[str, float]:
+        return {stage: total / max(1, self.count) * 1e6 for stage, total in self.totals.items()}
+
+
+def check(status: int, data) -> None:
+    """The assertions a generated collection test makes"""
+    assert status in [200, 404], f"Expected 200 or 404, got {status}"
+    assert isinstance(data, list), "Response should be a list or dict"
+    for item in data:
+        assert isinstance(item, dict), "Items should be dictionaries"
+        assert len(item) > 0, "Item should have at least one field"
+        if "_links" in item:
+            assert isinstance(item["_links"], dict), "_links should be a dictionary"
+
+
+def one_request(get: Callable, url: str, i: int, store: ArtifactStore, timer: StageTimer) -> None:
+    start = time.perf_counter()
+    response = get(url)
+    response.content
+    fetched = time.perf_counter()
+    data = response.json()
+    decoded = time.perf_counter()
+    store.put(f"bench_outputs/get_all_posts_{i % 50}.json", render_response(response).encode("utf-8"))
+    saved = time.perf_counter()
+    check(response.status_code, data)
+    timer.add({"request": fetched - start, "decode": decoded - fetched,
+               "save": saved - decoded, "assert": time.perf_counter() - saved})
+
+
+def run_sequential(get: Callable, url: str, count: int, store: ArtifactStore) -> StageTimer:
+    timer = StageTimer()
+    for i in range(count):
+        one_request(get, url, i, store, timer)
+    return timer
+
+
+def run_threads(get: Callable, url: str, count: int, store: ArtifactStore, concurrency: int) -> StageTimer:
+    timer = StageTimer()
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(lambda i: one_request(get, url, i, store, timer), range(count)))
+    return timer
+
+
+def run_async(url: str, count: int, store: ArtifactStore, concurrency: int) -> StageTimer:
+    timer = StageTimer()
+
+    async def worker(session, queue):
+        while True:
+            try:
+                i = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start = time.perf_counter()
+            async with session.get(url) as response:
+                body = await response.read()
+                status = response.status
+            fetched = time.perf_counter()
+            data = json.loads(body)
+            decoded = time.perf_counter()
+            store.put(f"bench_outputs/get_all_posts_{i % 50}.json", json.dumps(data, indent=4).encode("utf-8"))
+            saved = time.perf_counter()
+            check(status, data)
+            timer.add({"request": fetched - start, "decode": decoded - fetched,
+                       "save": saved - decoded, "assert": time.perf_counter() - saved})
+
+    async def main():
+        queue = asyncio.Queue()
+        for i in range(count):
+            queue.put_nowait(i)
+        connector = aiohttp.TCPConnector(limit=concurrency)
+        async with aiohttp.ClientSession(connector=connector, auth=aiohttp.BasicAuth(*AUTH)) as session:
+            await asyncio.gather(*(worker(session, queue) for _ in range(concurrency)))
+
+    asyncio.run(main())
+    return timer
+
+
+def measure(name: str, run: Callable[[], StageTimer], count: int) -> Dict:
+    start = time.perf_counter()
+    timer = run()
+    elapsed = time.perf_counter() - start
+    stages = timer.per_request_us()
+    result = {
+        "pattern": name,
+        "requests": count,
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(count / elapsed, 1),
+        "per_request_us": {stage: round(us, 1) for stage, us in stages.items()},
+    }
+    print(f"   {name:<10} {result['requests_per_second']:>8.0f} req/s   "
+          + "  ".join(f"{stage} {us:7.0f}us" for stage, us in stages.items()), flush=True)
+    return result
+
+
+def run_suite(port: int) -> Optional[Dict]:
+    """Run the generated suite against the mock server; the suites hard-code localhost:8000
+
+    The governor's rate ceiling is lifted, so the run measures the harness and not the throttle.
+    """
+    if port != 8000:
+        print("   (skipped: the generated suites call localhost:8000, rerun with --port 8000)")
+        return None
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", "--no-http-cache",
+         "--no-record-durations", "--max-rps", "1000000", str(HERE / "generated")],
+        cwd=HERE, capture_output=True, text=True,
+    )
+    elapsed = time.perf_counter() - start
+    requests_sent = 0
+    for line in completed.stdout.splitlines():
+        if line.startswith("request governor:"):
+            requests_sent = int(line.split()[2])
+    outcome = completed.stdout.strip().splitlines()[-1] if completed.stdout.strip() else ""
+    print(f"   generated suite: {requests_sent} requests in {elapsed:.1f}s "
+          f"({requests_sent / elapsed:.0f} req/s) -- {outcome}")
+    return {"seconds": round(elapsed, 2), "requests": requests_sent,
+            "requests_per_second": round(requests_sent / elapsed, 1), "outcome": outcome}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Requests per second the test harness can drive on its own")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per pattern")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--items", type=int, default=10, help="items per page the mock server returns")
+    parser.add_argument("--port", type=int, default=None, help="mock server port (default: a free one)")
+    parser.add_argument("--suite", action="store_true", help="also time the generated suite (needs --port 8000)")
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    port = args.port or free_port()
+    server = start_mock_server(port, args.items)
+    url = f"http://127.0.0.1:{port}/wp-json{PATH}"
+    auth = HTTPBasicAuth(*AUTH)
+    count = max(1, args.requests)
+    results: List[Dict] = []
+    print(f"Mock server on port {port}; {count} requests per pattern, concurrency {args.concurrency}\n")
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = ArtifactStore(Path(tmp))
+
+            per_call = wp_runtime._original_request
+            results.append(measure("per-call", lambda: run_sequential(
+                lambda u: per_call("GET", u, auth=auth, timeout=10), url, count, store), count))
+
+            with requests.Session() as session:
+                session.auth = auth
+                results.append(measure("pooled", lambda: run_sequential(
+                    lambda u: session.get(u, timeout=10), url, count, store), count))
+
+            # Unthrottled, so only the runtime's own overhead is measured
+            wp_runtime.install(rate=1e9, max_concurrency=max(args.concurrency, 1))
+            try:
+                runtime = wp_runtime.get_session()
+                results.append(measure("runtime", lambda: run_sequential(
+                    lambda u: runtime.get(u, auth=auth, timeout=10), url, count, store), count))
+            finally:
+                wp_runtime.uninstall()
+
+            with requests.Session() as session:
+                session.auth = auth
+                session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=args.concurrency))
+                results.append(measure("threads", lambda: run_threads(
+                    lambda u: session.get(u, timeout=10), url, count, store, args.concurrency), count))
+
+            if aiohttp is not None:
+                results.append(measure("async", lambda: run_async(url, count, store, args.concurrency), count))
+            else:
+                print("   async      skipped (pip install aiohttp)")
+
+        suite = None
+        if args.suite:
+            print()
+            suite = run_suite(port)
+    finally:
+        server.terminate()
+        server.wait()
+
+    baseline = results[0]["requests_per_second"]
+    best = max(results, key=lambda r: r["requests_per_second"])
+    print(f"\nFastest: {best['pattern']} at {best['requests_per_second']:.0f} req/s "
+          f"({best['requests_per_second'] / baseline:.1f}x per-call)")
+    slowest_stage = max(STAGES[1:], key=lambda stage: statistics.mean(r["per_request_us"][stage] for r in results))
+    print(f"Largest non-network stage: {slowest_stage}")
+
+    output = args.output or RESULTS_DIR / f"harness-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"requests": count, "concurrency": args.concurrency, "results": results, "suite": suite},
+                  f, indent=2)
+    print(f"\nResults: {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+"""
+Data-volume scaling benchmark for collection endpoints
+Grows each seedable collection through increasing sizes and, at every size,
+times list requests for several per_page values with and without _fields and
+_embed. The result is a latency curve per endpoint plus its log-log slope, so
+routes whose list latency grows with the total number of items stand out.
+
+Usage:
+    python api-tests/bench_scaling.py
+    python api-tests/bench_scaling.py --sizes 100 1000 10000 --endpoint /wp/v2/posts
+"""
+
+import argparse
+import json
+import math
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import requests
+from requests.auth import HTTPBasicAuth
+
+import wp_runtime
+from catalogue import collection_paths, load_catalogue
+from config import APP_PASSWORD, BASE_URL, USERNAME
+from seeder import SEED_KINDS, Seeder
+
+DEFAULT_SIZES = [100, 1000, 10000, 100000]
+DEFAULT_PER_PAGE = [10, 50, 100]
+VARIANTS = {
+    "full": {},
+    "fields": {"_fields": "id"},
+    "embed": {"_embed": "1"},
+}
+RESULTS_DIR = Path(__file__).parent / "bench"
+# Slope of log(latency) against log(size); list pages should stay close to flat
+SLOPE_WARNING = 0.3
+# Items seeded for a kind that a benchmarked kind requires (comments need posts)
+REQUIRED_ITEMS = 10
+
+
+def collection_total(session: requests.Session, url: str) -> int:
+    response = session.get(url, params={"per_page": 1, "_fields": "id"}, timeout=60)
+    return int(response.headers.get("X-WP-Total", 0))
+
+
+def time_request(session: requests.Session, url: str, params: Dict[str, str], samples: int) -> Dict[str, float]:
+    """Median and worst wall time (ms) over samples, after one warm-up request"""
+    session.get(url, params=params, timeout=120).content
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        response = session.get(url, params=params, timeout=120)
+        response.content
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "median_ms": statistics.median(timings),
+        "max_ms": max(timings),
+        "status": response.status_code,
+        "bytes": len(response.content),
+    }
+
+
+def log_log_slope(points: List[tuple]) -> float:
+    """Least-squares slope of log(latency) against log(size)"""
+    points = [(math.log(size), math.log(ms)) for size, ms in points if size > 0 and ms > 0]
+    if len(points) < 2:
+        return 0.0
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    if not var_x:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x
+
+
+def seed_requirements(seeder: Seeder, kind) -> None:
+    """Give the kinds that kind requires some items, when the run has seeded none"""
+    kinds = {other.name: other for other in SEED_KINDS}
+    for name in kind.requires:
+        if not seeder.recorded().get(name):
+            seed_requirements(seeder, kinds[name])
+            print(f"   seeding {REQUIRED_ITEMS} {name} for {kind.name} ...", flush=True)
+            seeder.create(kinds[name], REQUIRED_ITEMS)
+
+
+def benchmark_endpoint(seeder: Seeder, session: requests.Session, kind, sizes: List[int],
+                       per_pages: List[int], samples: int) -> Dict:
+    url = f"{seeder.base_url}{kind.path}"
+    curve = []
+    seed_requirements(seeder, kind)
+    for size in sizes:
+        existing = collection_total(session, url)
+        if existing < size:
+            print(f"   seeding {size - existing} {kind.name} ...", flush=True)
+            seeder.create(kind, size - existing, start=existing)
+        total = collection_total(session, url)
+        # A flat curve over a collection that never grew would read as "scales well"
+        if total < size:
+            reason = f"collection reached {total} of {size} items"
+            if kind.name in seeder.skipped:
+                reason += f" (no {', '.join(kind.requires)} to attach them to)"
+            print(f"   skipped: {reason}", flush=True)
+            return {"path": kind.path, "curve": curve, "slopes": {}, "skipped": reason}
+
+        for per_page in per_pages:
+            for variant, extra in VARIANTS.items():
+                params = {"per_page": per_page, **extra}
+                result = time_request(session, url, params, samples)
+                curve.append({"size": total, "per_page": per_page, "variant": variant, **result})
+                print(f"   {total:>7} items  per_page={per_page:<3} {variant:<6} "
+                      f"{result['median_ms']:8.1f} ms (max {result['max_ms']:.1f})", flush=True)
+
+    slopes = {}
+    for per_page in per_pages:
+        for variant in VARIANTS:
+            points = [(p["size"], p["median_ms"]) for p in curve
+                      if p["per_page"] == per_page and p["variant"] == variant]
+            slopes[f"per_page={per_page} {variant}"] = round(log_log_slope(points), 3)
+    return {"path": kind.path, "curve": curve, "slopes": slopes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Collection latency against data volume")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--per-page", type=int, nargs="+", default=DEFAULT_PER_PAGE)
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--endpoint", action="append", default=[],
+                        help="collection path to benchmark, e.g. /wp/v2/posts (repeatable)")
+    parser.add_argument("--keep", action="store_true", help="keep the seeded data afterwards")
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    known = set(collection_paths(load_catalogue()))
+    kinds = [
+        kind for kind in SEED_KINDS
+        if (not known or kind.path in known) and (not args.endpoint or kind.path in args.endpoint)
+    ]
+    if not kinds:
+        print("No seedable collection endpoints selected")
+        return 1
+
+    # Seeding goes through the governed runtime; timing uses a plain keep-alive session
+    wp_runtime.install()
+    seeder = Seeder(base_url=BASE_URL)
+    session = requests.Session()
+    session.auth = HTTPBasicAuth(USERNAME, APP_PASSWORD)
+
+    results = []
+    try:
+        for kind in kinds:
+            print(f"\n{kind.path}")
+            results.append(benchmark_endpoint(seeder, session, kind, sorted(args.sizes), args.per_page,
+                                              max(1, args.samples)))
+    finally:
+        if not args.keep:
+            print("\nRemoving seeded data ...")
+            seeder.teardown()
+
+    print("\nScaling (log-log slope of median latency against collection size):")
+    for result in results:
+        if "skipped" in result:
+            print(f"   {result['path']:<24} skipped: {result['skipped']}")
+        for label, slope in result["slopes"].items():
+            flag = "  <-- grows with data size" if slope > SLOPE_WARNING else ""
+            print(f"   {result['path']:<24} {label:<22} {slope:6.2f}{flag}")
+
+    output = args.output or RESULTS_DIR / f"scaling-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"base_url": BASE_URL, "sizes": args.sizes, "results": results}, f, indent=2)
+    print(f"\nResults: {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+"""
+Record and replay of HTTP exchanges
+With --cassette=record every request the runtime sends is written to a
+cassette (one JSON file per test module under api-tests/cassettes/, bodies as
+content-addressed blobs). With --cassette=replay the runtime answers from the
+cassettes without opening a connection, so the suites run with no WordPress
+server at all.
+"""
+
+import hashlib
+import io
+import json
+import threading
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from artifacts import ArtifactStore, IndexLock
+from wp_runtime import WPResponse, route_key
+
+CASSETTE_DIR = Path(__file__).parent / "cassettes"
+MODES = ("record", "replay")
+# Requests made outside any test: health checks, seeding, session fixtures
+SESSION_SCOPE = "<session>"
+# Per-connection or per-run headers that would only add noise to a cassette
+DROPPED_HEADERS = frozenset({
+    "content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive", "set-cookie",
+})
+MAX_UNMATCHED = 20
+
+
+class CassetteMiss(requests.exceptions.ConnectionError):
+    """No recorded exchange matches the request
+
+    It is a ConnectionError, so suites skip it the same way they skip an
+    unreachable server.
+    """
+
+
+def _body_bytes(body: Any) -> Optional[bytes]:
+    if isinstance(body, str):
+        return body.encode("utf-8")
+    if isinstance(body, bytes):
+        return body
+    return None
+
+
+def _hash(data: Optional[bytes]) -> str:
+    return hashlib.sha256(data).hexdigest()[:16] if data else ""
+
+
+def match_keys(method: str, url: str, auth: str, body: str) -> Tuple[str, str, str]:
+    """Keys from most to least specific: exact request, same URL, same route"""
+    method = method.upper()
+    signed = "auth" if auth else "anon"
+    return (
+        f"{method} {url} {auth} {body}",
+        f"{method} {url} {signed}",
+        f"{route_key(method, url)} {signed}",
+    )
+
+
+class Cassette:
+    """Recorded exchanges, grouped by the test that made them"""
+
+    def __init__(self, mode: str, directory: Path = CASSETTE_DIR):
+        if mode not in MODES:
+            raise ValueError(f"cassette mode must be one of {', '.join(MODES)}, not {mode!r}")
+        self.mode = mode
+        self.directory = directory
+        self.blobs = ArtifactStore(directory)
+        self.scope = SESSION_SCOPE
+        self.recorded: Dict[str, List[Dict[str, Any]]] = {}
+        self._files: Dict[Path, Dict[str, List[Dict[str, Any]]]] = {}
+        self._used: set = set()
+        self._keys: Dict[int, Tuple[str, str, str]] = {}
+        self._lock = threading.Lock()
+        self.replayed = 0
+        self.unmatched: List[str] = []
+
+    def use(self, scope: Optional[str]) -> None:
+        """Attribute the following requests to a test id (None: the session)"""
+        self.scope = scope or SESSION_SCOPE
+
+    def file_for(self, scope: str) -> Path:
+        if scope == SESSION_SCOPE:
+            return self.directory / "_session.json"
+        module = scope.split("::", 1)[0]
+        return self.directory / Path(module).with_suffix(".json")
+
+    def _load(self, path: Path) -> Dict[str, List[Dict[str, Any]]]:
+        if path not in self._files:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self._files[path] = json.load(f).get("tests", {})
+            except (OSError, ValueError):
+                self._files[path] = {}
+        return self._files[path]
+
+    def record(self, request, response) -> None:
+        request_body = _body_bytes(request.body)
+        exchange = {
+            "method": request.method.upper(),
+            "url": request.url,
+            "auth": _hash(request.headers.get("Authorization", "").encode()),
+            "request_body": self.blobs.put_blob(request_body) if request_body else None,
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": {k: v for k, v in response.headers.items() if k.lower() not in DROPPED_HEADERS},
+            "encoding": response.encoding,
+            "body": self.blobs.put_blob(response.content or b""),
+            "elapsed": round(response.elapsed.total_seconds(), 4) if response.elapsed else None,
+        }
+        with self._lock:
+            self.recorded.setdefault(self.scope, []).append(exchange)
+
+    def _candidates(self) -> List[Tuple[str, int, Dict[str, Any]]]:
+        """This test's exchanges, then the rest of its module's, then the session's"""
+        tests = self._load(self.file_for(self.scope))
+        candidates = [(self.scope, i, ex) for i, ex in enumerate(tests.get(self.scope, []))]
+        for scope, exchanges in tests.items():
+            if scope != self.scope:
+                candidates.extend((scope, i, ex) for i, ex in enumerate(exchanges))
+        if self.scope != SESSION_SCOPE:
+            session = self._load(self.file_for(SESSION_SCOPE)).get(SESSION_SCOPE, [])
+            candidates.extend((SESSION_SCOPE, i, ex) for i, ex in enumerate(session))
+        return candidates
+
+    def find(self, request) -> Optional[Dict[str, Any]]:
+        wanted = match_keys(request.method, request.url,
+                            _hash(request.headers.get("Authorization", "").encode()),
+                            _hash(_body_bytes(request.body)))
+        with self._lock:
+            candidates = self._candidates()
+            keyed = [(scope, i, ex, self._exchange_keys(ex)) for scope, i, ex in candidates]
+            # Exchanges are consumed in order, so a GET before and after an update gets both bodies
+            for level in range(len(wanted)):
+                for scope, i, ex, keys in keyed:
+                    if keys[level] == wanted[level] and (scope, i) not in self._used:
+                        self._used.add((scope, i))
+                        return ex
+            # Polled more often than during recording: repeat the closest scope's last answer
+            repeats = [(scope, ex) for scope, i, ex, keys in keyed if keys[1] == wanted[1]]
+            if repeats:
+                return [ex for scope, ex in repeats if scope == repeats[0][0]][-1]
+        return None
+
+    def _exchange_keys(self, exchange: Dict[str, Any]) -> Tuple[str, str, str]:
+        keys = self._keys.get(id(exchange))
+        if keys is None:
+            body = exchange["request_body"][:16] if exchange["request_body"] else ""
+            keys = self._keys[id(exchange)] = match_keys(exchange["method"], exchange["url"], exchange["auth"], body)
+        return keys
+
+    def play(self, request, adapter=None) -> WPResponse:
+        exchange = self.find(request)
+        if exchange is None:
+            with self._lock:
+                if len(self.unmatched) < MAX_UNMATCHED:
+                    self.unmatched.append(f"{request.method} {request.url}")
+            raise CassetteMiss(f"{request.method} {request.url}: not in the cassette for {self.scope}",
+                               request=request)
+        body = self.blobs.read_blob(exchange["body"]) or b""
+        response = WPResponse()
+        response.status_code = exchange["status"]
+        response.reason = exchange["reason"]
+        response.headers = CaseInsensitiveDict(exchange["headers"])
+        response.encoding = exchange["encoding"]
+        response.url = request.url
+        response.request = request
+        response.connection = adapter
+        response.raw = io.BytesIO(body)
+        response._content = body
+        response._content_consumed = True
+        response.elapsed = timedelta(seconds=exchange.get("elapsed") or 0)
+        response.from_cassette = True
+        self.replayed += 1
+        return response
+
+    def save(self) -> int:
+        """Write this process's recordings, replacing those tests' old exchanges; returns files written"""
+        by_file: Dict[Path, Dict[str, List[Dict[str, Any]]]] = {}
+        with self._lock:
+            for scope, exchanges in self.recorded.items():
+                by_file.setdefault(self.file_for(scope), {})[scope] = exchanges
+        for path, scopes in by_file.items():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # pytest-xdist workers can share a module file
+            with IndexLock(path.with_suffix(".lock")):
+                self._files.pop(path, None)
+                tests = dict(self._load(path))
+                tests.update(scopes)
+                tmp_path = path.with_suffix(".tmp")
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump({"version": 1, "tests": dict(sorted(tests.items()))}, f, indent=1)
+                tmp_path.replace(path)
+        return len(by_file)
+
+    def counts(self) -> Dict[str, Any]:
+        return {
+            "recorded": sum(len(exchanges) for exchanges in self.recorded.values()),
+            "tests": len(self.recorded),
+            "replayed": self.replayed,
+            "unmatched": list(self.unmatched),
+        }
+
+    @staticmethod
+    def combine(counts: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Add up the counts of several processes (pytest-xdist workers)"""
+        return {
+            "recorded": sum(c["recorded"] for c in counts),
+            "tests": sum(c["tests"] for c in counts),
+            "replayed": sum(c["replayed"] for c in counts),
+            "unmatched": [request for c in counts for request in c["unmatched"]][:MAX_UNMATCHED],
+        }
+
+    @staticmethod
+    def report(mode: str, counts: Dict[str, Any]) -> List[str]:
+        if mode == "record":
+            return [f"cassette: recorded {counts['recorded']} exchanges from {counts['tests']} tests"]
+        lines = [f"cassette: replayed {counts['replayed']} exchanges, {len(counts['unmatched'])} requests unmatched"]
+        lines.extend(f"  not recorded: {request}" for request in counts["unmatched"][:5])
+        return lines
@@ -0,0 +1,41 @@
+"""
+Endpoint catalogue exported by test_generator.py
+One JSON entry per generated endpoint, so runtime tools (seeder, benchmarks,
+mock server) know the routes without re-parsing the PHP sources
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List
+
+CATALOGUE_FILE = Path(__file__).parent / "generated" / "endpoints.json"
+
+
+def save_catalogue(entries: List[Dict[str, Any]], path: Path = CATALOGUE_FILE) -> Path:
+    """Write the catalogue; an unchanged catalogue is left untouched (watchers key off mtimes)"""
+    text = json.dumps(sorted(entries, key=lambda e: e["path"]), indent=2)
+    try:
+        if path.read_text(encoding="utf-8") == text:
+            return path
+    except OSError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def load_catalogue(path: Path = CATALOGUE_FILE) -> List[Dict[str, Any]]:
+    """Catalogue entries, or an empty list when the generator has not exported one yet"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def collection_paths(entries: List[Dict[str, Any]], writable: bool = False) -> List[str]:
+    """Paths of collection endpoints, optionally only those that accept POST"""
+    return [
+        e["path"] for e in entries
+        if e.get("resource_type") == "collection" and (not writable or "POST" in e.get("methods", []))
+    ]
@@ -1,3 +1,29 @@
 BASE_URL = "http://localhost:8000/wp-json"
 USERNAME = "maryamfatima"
 APP_PASSWORD = "I1KhCgDNwKwjYyo9SLqGbdm2"
+
+# Request governor: upper bounds shared by all pytest-xdist workers.
+# 20 req/s is sized for a shared or production-like WordPress site; against a
+# local site or mock_server.py raise it with pytest --max-rps (e.g. 1000).
+MAX_REQUESTS_PER_SECOND = 20.0
+MAX_CONCURRENCY = 4
+
+# Transport policy: connect/read timeouts (seconds), retries and circuit breaker
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 10
+RETRY_ATTEMPTS = 3
+RETRY_BACKOFF = 0.5
+RETRY_BACKOFF_MAX = 8.0
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 30.0
+
+# Fixture seeding (pytest --seed): items created per resource before the run
+SEED_COUNTS = {
+    "users": 3,
+    "categories": 5,
+    "tags": 5,
+    "menus": 2,
+    "posts": 20,
+    "pages": 5,
+    "comments": 20,
+}
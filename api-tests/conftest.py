@@ -0,0 +1,263 @@
+"""
+Shared pytest configuration for the WordPress REST API suites
+(hand-written tests and api-tests/generated)
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Make the helper modules next to this file importable from every suite
+sys.path.insert(0, str(Path(__file__).parent))
+
+import artifacts
+import batch
+import cassettes
+import health
+import http_cache
+import resources
+import seeder
+import sharding
+import snapshots
+import wp_runtime
+
+HEALTH_KEY = pytest.StashKey[health.ServerHealth]()
+SEEDER_KEY = pytest.StashKey[seeder.Seeder]()
+SNAPSHOT_KEY = pytest.StashKey[list]()
+CASSETTE_COUNTS_KEY = pytest.StashKey[list]()
+RESOURCES_KEY = pytest.StashKey[resources.ResourceTracker]()
+RESOURCE_COUNTS_KEY = pytest.StashKey[list]()
+
+
+def pytest_addoption(parser):
+    sharding.add_options(parser)
+
+    group = parser.getgroup("wp-runtime", "WordPress request runtime")
+    group.addoption("--max-rps", type=float, default=None,
+                    help="request rate ceiling shared by all workers (default: config.MAX_REQUESTS_PER_SECOND)")
+    group.addoption("--max-concurrency", type=int, default=None,
+                    help="in-flight request ceiling shared by all workers (default: config.MAX_CONCURRENCY)")
+    group.addoption("--no-http-cache", action="store_true", default=False,
+                    help="do not revalidate GET responses against api-tests/.http-cache")
+    group.addoption("--clear-http-cache", action="store_true", default=False,
+                    help="empty api-tests/.http-cache before the run")
+    group.addoption("--skip-health-check", action="store_true", default=False,
+                    help="run the suites even when the WordPress server does not answer the start-up probe")
+    group.addoption("--cassette", choices=cassettes.MODES, default=None,
+                    help="record every HTTP exchange to api-tests/cassettes, or replay them with no server")
+
+    group = parser.getgroup("wp-seed", "fixture data seeding")
+    group.addoption("--seed", action="store_true", default=False,
+                    help="create posts, pages, terms, comments, menus and users before the run (config.SEED_COUNTS)")
+    group.addoption("--seed-scale", type=float, default=1.0,
+                    help="multiply every seed count, e.g. 500 for about 10k posts")
+    group.addoption("--keep-seed", action="store_true", default=False,
+                    help="leave the seeded data in place after the run")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "offline: needs no WordPress server; never skipped by the health probe")
+    config.pluginmanager.register(sharding.ShardingPlugin(config), "wp-sharding")
+    cache = None
+    cassette = None
+    if config.getoption("cassette"):
+        cassette = cassettes.Cassette(config.getoption("cassette"))
+    # Replayed responses need no revalidation
+    if not config.getoption("no_http_cache") and config.getoption("cassette") != "replay":
+        cache = http_cache.HTTPCache()
+        if config.getoption("clear_http_cache") and not hasattr(config, "workerinput"):
+            cache.clear()
+    wp_runtime.install(
+        rate=config.getoption("max_rps"),
+        max_concurrency=config.getoption("max_concurrency"),
+        cache=cache,
+        cassette=cassette,
+    )
+
+    if config.getoption("skip_health_check") or config.getoption("cassette") == "replay":
+        return
+    # pytest-xdist workers reuse the controller's probe instead of sending their own
+    workerinput = getattr(config, "workerinput", {})
+    if "wp_health" in workerinput:
+        config.stash[HEALTH_KEY] = health.ServerHealth.from_dict(workerinput["wp_health"])
+    else:
+        config.stash[HEALTH_KEY] = health.probe()
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    # Fold each pytest-xdist worker's transfer counts into the controller's report
+    adapter = wp_runtime.get_adapter()
+    adapter.transfer.merge(node.workeroutput.get("wp_transfer", {}))
+    adapter.connections.merge(node.workeroutput.get("wp_connections", {}))
+    if adapter.cache is not None:
+        adapter.cache.stats.merge(node.workeroutput.get("wp_cache", {}))
+    artifacts.default_store().merge(node.workeroutput.get("wp_artifacts", {}))
+    node.config.stash.setdefault(SNAPSHOT_KEY, []).extend(
+        snapshots.SnapshotDiff.from_dict(diff) for diff in node.workeroutput.get("wp_snapshots", [])
+    )
+    if "wp_cassette" in node.workeroutput:
+        node.config.stash.setdefault(CASSETTE_COUNTS_KEY, []).append(node.workeroutput["wp_cassette"])
+    if "wp_resources" in node.workeroutput:
+        node.config.stash.setdefault(RESOURCE_COUNTS_KEY, []).append(node.workeroutput["wp_resources"])
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    if HEALTH_KEY in node.config.stash:
+        node.workerinput["wp_health"] = node.config.stash[HEALTH_KEY].to_dict()
+
+
+def pytest_report_header(config):
+    if config.getoption("cassette") == "replay":
+        return f"WordPress: replaying recorded responses from {cassettes.CASSETTE_DIR}"
+    if HEALTH_KEY in config.stash:
+        return config.stash[HEALTH_KEY].describe()
+
+
+def pytest_collection_modifyitems(config, items):
+    server = config.stash.get(HEALTH_KEY, None)
+    if server is None or server.reachable:
+        return
+    skip = pytest.mark.skip(reason=f"WordPress server is not running or not accessible ({server.error})")
+    for item in items:
+        if item.get_closest_marker("offline") is None:
+            item.add_marker(skip)
+
+
+def pytest_unconfigure(config):
+    wp_runtime.uninstall()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    # Setup, call and teardown requests all belong to the test's cassette entry
+    cassette = wp_runtime.get_adapter().cassette
+    if cassette is None:
+        yield
+        return
+    cassette.use(sharding.history_key(item.config.rootpath, item.nodeid))
+    try:
+        yield
+    finally:
+        cassette.use(None)
+
+
+def pytest_runtest_setup(item):
+    # Once the breaker has tripped, skip without even building the request
+    if wp_runtime.get_breaker().is_open():
+        pytest.skip("WordPress server is not running or not accessible (circuit breaker open)")
+
+
+def pytest_sessionstart(session):
+    config = session.config
+    # Seed once, from the controller when running under pytest-xdist
+    if hasattr(config, "workerinput") or not config.getoption("seed"):
+        return
+    server = config.stash.get(HEALTH_KEY, None)
+    if server is not None and not server.reachable:
+        return
+    data_seeder = seeder.Seeder(scale=config.getoption("seed_scale"))
+    start = time.monotonic()
+    seeded = data_seeder.seed()
+    summary = ", ".join(f"{len(ids)} {name}" for name, ids in seeded.items()) or "nothing"
+    failed = sum(data_seeder.errors.values())
+    skipped = f", skipped {', '.join(data_seeder.skipped)}" if data_seeder.skipped else ""
+    config.stash[SEEDER_KEY] = data_seeder
+    print(f"\nseeded {summary} in {time.monotonic() - start:.1f}s ({failed} failed{skipped})")
+
+
+def pytest_sessionfinish(session):
+    # Every process writes its own index changes; flush() merges under a lock
+    store = artifacts.default_store()
+    # Diff before flushing, while the changed entries are still this process's own
+    diffs = snapshots.diff_run(store)
+    session.config.stash.setdefault(SNAPSHOT_KEY, []).extend(diffs)
+    store.flush()
+    workeroutput = getattr(session.config, "workeroutput", None)
+    if workeroutput is not None:
+        adapter = wp_runtime.get_adapter()
+        workeroutput["wp_transfer"] = adapter.transfer.to_dict()
+        workeroutput["wp_connections"] = adapter.connections.to_dict()
+        if adapter.cache is not None:
+            workeroutput["wp_cache"] = adapter.cache.stats.to_dict()
+        workeroutput["wp_artifacts"] = store.counts()
+        workeroutput["wp_snapshots"] = [diff.to_dict() for diff in diffs]
+
+    cassette = wp_runtime.get_adapter().cassette
+    if cassette is not None:
+        if cassette.mode == "record":
+            cassette.save()
+        if workeroutput is not None:
+            workeroutput["wp_cassette"] = cassette.counts()
+        else:
+            session.config.stash.setdefault(CASSETTE_COUNTS_KEY, []).append(cassette.counts())
+
+    tracker = session.config.stash.get(RESOURCES_KEY, None)
+    if tracker is not None:
+        if workeroutput is not None:
+            workeroutput["wp_resources"] = tracker.counts()
+        else:
+            session.config.stash.setdefault(RESOURCE_COUNTS_KEY, []).append(tracker.counts())
+
+    data_seeder = session.config.stash.get(SEEDER_KEY, None)
+    if data_seeder is not None and not session.config.getoption("keep_seed"):
+        data_seeder.teardown()
+
+
+@pytest.fixture(scope="session")
+def wp_resource_tracker(pytestconfig):
+    """This worker's record of created resources; first clears what an interrupted run left"""
+    tracker = resources.ResourceTracker()
+    pytestconfig.stash[RESOURCES_KEY] = tracker
+    tracker.sweep()
+    yield tracker
+    # Whatever a scope failed to delete gets one more try
+    tracker.sweep()
+
+
+@pytest.fixture
+def wp_resources(wp_resource_tracker):
+    """ResourceScope for one test: uniquely named resources, deleted after the test"""
+    with wp_resource_tracker.scope() as scope:
+        yield scope
+
+
+@pytest.fixture
+def wp_batch():
+    """BatchClient for write-heavy setup; anything still queued is sent at teardown"""
+    with batch.BatchClient() as client:
+        yield client
+
+
+def pytest_terminal_summary(terminalreporter):
+    adapter = wp_runtime.get_adapter()
+    # Nothing was sent (--collect-only, everything skipped)
+    if adapter.governor.requests:
+        terminalreporter.write_line(f"request governor: {wp_runtime.get_governor().summary()}")
+        terminalreporter.write_line(
+            f"transport: {adapter.retries} retries, circuit breaker tripped {adapter.breaker.trips} times"
+        )
+    for line in adapter.transfer.report():
+        terminalreporter.write_line(line)
+    for line in adapter.connections.report():
+        terminalreporter.write_line(line)
+    if adapter.cache is not None:
+        for line in adapter.cache.stats.report():
+            terminalreporter.write_line(line)
+    store = artifacts.default_store()
+    if store.saved:
+        terminalreporter.write_line(f"response artifacts: {store.summary()}")
+    diffs = sorted(terminalreporter.config.stash.get(SNAPSHOT_KEY, []), key=lambda diff: diff.key)
+    for line in snapshots.report(diffs):
+        terminalreporter.write_line(line)
+    mode = terminalreporter.config.getoption("cassette")
+    if mode:
+        counts = cassettes.Cassette.combine(terminalreporter.config.stash.get(CASSETTE_COUNTS_KEY, []))
+        for line in cassettes.Cassette.report(mode, counts):
+            terminalreporter.write_line(line)
+    counts = resources.ResourceTracker.combine(terminalreporter.config.stash.get(RESOURCE_COUNTS_KEY, []))
+    for line in resources.ResourceTracker.report(counts):
+        terminalreporter.write_line(line)
@@ -0,0 +1,131 @@
+"""
+Server health probe run once per test session
+Lets the suites skip in milliseconds when WordPress is down instead of
+letting every test discover it on its own
+"""
+
+import re
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from config import BASE_URL, CONNECT_TIMEOUT
+
+HEALTH_TIMEOUT = 5
+# The generator tag WordPress prints in the site's <head> unless a plugin removes it
+GENERATOR_META = re.compile(r'<meta[^>]+name=["\']generator["\'][^>]+content=["\']WordPress ([\w.-]+)', re.I)
+GENERATOR_BYTES = 64 * 1024
+
+
+@dataclass
+class ServerHealth:
+    """What the /wp-json index told us about the server"""
+    url: str
+    reachable: bool
+    status_code: Optional[int] = None
+    elapsed: float = 0.0
+    name: str = ""
+    version: str = ""
+    server: str = ""
+    powered_by: str = ""
+    namespaces: List[str] = field(default_factory=list)
+    error: str = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ServerHealth":
+        return cls(**data)
+
+    def describe(self) -> str:
+        if not self.reachable:
+            return f"WordPress: {self.url} unreachable ({self.error})"
+        version = f"WordPress {self.version}" if self.version else "WordPress version unknown"
+        server = ", ".join(part for part in (self.server, self.powered_by) if part)
+        if server:
+            version += f"; server {server}"
+        namespaces = ", ".join(self.namespaces) or "none"
+        return (f"WordPress: {self.url} answered {self.status_code} in {self.elapsed * 1000:.0f}ms, "
+                f"site {self.name!r} ({version}), namespaces: {namespaces}")
+
+
+def header_version(headers) -> str:
+    """A WordPress version from X-WP-*Version headers some hosts and plugins add"""
+    for name, value in headers.items():
+        if name.lower().startswith("x-wp-") and "version" in name.lower() and value:
+            return value.strip()
+    return ""
+
+
+def home_url(base_url: str) -> str:
+    """Site front page for a REST base (/wp-json or ?rest_route=)"""
+    url = base_url.split("?", 1)[0].rstrip("/")
+    for suffix in ("/wp-json", "/index.php"):
+        if url.endswith(suffix):
+            url = url[:-len(suffix)]
+    return url + "/"
+
+
+def generator_version(session: requests.Session, base_url: str, timeout) -> str:
+    """The version in the front page's generator meta tag, reading only the start of the page"""
+    try:
+        with session.get(home_url(base_url), timeout=timeout, stream=True) as response:
+            if response.status_code != 200 or "html" not in response.headers.get("Content-Type", ""):
+                return ""
+            head = response.raw.read(GENERATOR_BYTES, decode_content=True)
+    except requests.exceptions.RequestException:
+        return ""
+    match = GENERATOR_META.search(head.decode("utf-8", "replace"))
+    return match.group(1) if match else ""
+
+
+def probe(base_url: str = BASE_URL, timeout: float = HEALTH_TIMEOUT) -> ServerHealth:
+    """Fetch the REST index once, without the runtime's retries"""
+    start = time.monotonic()
+    try:
+        # A bare session bypasses the shared runtime: one attempt, short timeouts
+        with requests.Session() as session:
+            response = session.get(
+                base_url,
+                params={"_fields": "name,namespaces,version"},
+                timeout=(min(CONNECT_TIMEOUT, timeout), timeout),
+            )
+            health = _from_index(base_url, response, time.monotonic() - start)
+            # The index has no version unless a plugin adds one; fall back to the front page
+            if health.reachable and not health.version:
+                health.version = generator_version(session, base_url, (min(CONNECT_TIMEOUT, timeout), timeout))
+    except requests.exceptions.RequestException as e:
+        return ServerHealth(url=base_url, reachable=False, elapsed=time.monotonic() - start,
+                            error=type(e).__name__)
+    return health
+
+
+def _from_index(base_url: str, response: requests.Response, elapsed: float) -> ServerHealth:
+    """What the index response says; the version comes from the index body or X-WP-* headers"""
+    health = ServerHealth(
+        url=base_url,
+        reachable=response.status_code < 500,
+        status_code=response.status_code,
+        elapsed=elapsed,
+        version=header_version(response.headers),
+        server=response.headers.get("Server", ""),
+        powered_by=response.headers.get("X-Powered-By", ""),
+    )
+    if not health.reachable:
+        health.error = f"HTTP {response.status_code}"
+        return health
+    try:
+        index = response.json()
+    except ValueError:
+        health.reachable = False
+        health.error = "response is not the REST API index"
+        return health
+    if isinstance(index, dict):
+        health.name = str(index.get("name", ""))
+        health.namespaces = [str(ns) for ns in index.get("namespaces", [])]
+        if isinstance(index.get("version"), str) and index["version"]:
+            health.version = index["version"]
+    return health
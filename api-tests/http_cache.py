@@ -0,0 +1,196 @@
+"""
+On-disk HTTP revalidation cache for the test runtime
+Stores ETag / Last-Modified validators with the body of GET responses and
+revalidates with If-None-Match / If-Modified-Since, so resources that did
+not change since the last run come back as 304s. Streamed (stream=True)
+bodies are spooled to and served from disk, never held in memory.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from requests.structures import CaseInsensitiveDict
+
+CACHE_DIR = Path(__file__).parent / ".http-cache"
+
+
+class CacheStats:
+    """Per-route revalidation outcomes"""
+
+    FIELDS = ("revalidated", "hits", "misses", "stored", "no_validators")
+
+    def __init__(self):
+        self.routes: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def count(self, key: str, outcome: str) -> None:
+        with self._lock:
+            route = self.routes.setdefault(key, dict.fromkeys(self.FIELDS, 0))
+            route[outcome] += 1
+
+    def to_dict(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {key: dict(route) for key, route in self.routes.items()}
+
+    def merge(self, routes: Dict[str, Dict[str, int]]) -> None:
+        with self._lock:
+            for key, other in routes.items():
+                route = self.routes.setdefault(key, dict.fromkeys(self.FIELDS, 0))
+                for name in self.FIELDS:
+                    route[name] += other.get(name, 0)
+
+    def report(self, limit: int = 15) -> List[str]:
+        routes = self.to_dict()
+        revalidated = sum(r["revalidated"] for r in routes.values())
+        if not routes:
+            return []
+        hits = sum(r["hits"] for r in routes.values())
+        lines = [f"http cache: {hits}/{revalidated} revalidations answered 304"
+                 + (f" ({hits / revalidated:.0%})" if revalidated else "")]
+        for key, r in sorted(routes.items(), key=lambda kv: (-kv[1]["revalidated"], kv[0]))[:limit]:
+            if not r["revalidated"] and not r["stored"]:
+                continue
+            if r["revalidated"] and not r["hits"]:
+                note = "  <-- validators sent, never 304"
+            else:
+                note = ""
+            rate = f"{r['hits'] / r['revalidated']:.0%}" if r["revalidated"] else "-"
+            lines.append(f"  {rate:>5} hit  {r['hits']:>4}/{r['revalidated']:<4} stored {r['stored']:<4} {key}{note}")
+        no_validators = sum(1 for r in routes.values() if r["no_validators"] and not r["stored"])
+        if no_validators:
+            lines.append(f"  {no_validators} routes sent neither ETag nor Last-Modified")
+        return lines
+
+
+class CacheWriter:
+    """One entry being written: the body is spooled to a temp file, then both files are renamed into place"""
+
+    def __init__(self, meta_path: Path, body_path: Path, entry: Dict[str, Any]):
+        self.meta_path = meta_path
+        self.body_path = body_path
+        self.entry = entry
+        meta_path.parent.mkdir(parents=True, exist_ok=True)
+        # Temp files and renames, so pytest-xdist workers never read half an entry
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        self._body_tmp = body_path.with_name(body_path.name + suffix)
+        self._meta_tmp = meta_path.with_name(meta_path.name + suffix)
+        self._body = open(self._body_tmp, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        self._body.write(chunk)
+
+    def commit(self) -> None:
+        self._body.close()
+        with open(self._meta_tmp, "w", encoding="utf-8") as f:
+            json.dump(self.entry, f)
+        self._body_tmp.replace(self.body_path)
+        self._meta_tmp.replace(self.meta_path)
+
+    def abort(self) -> None:
+        self._body.close()
+        self._body_tmp.unlink(missing_ok=True)
+
+
+class HTTPCache:
+    """Validator cache keyed by method, URL and credentials
+
+    The Authorization header is part of the key (hashed), so an
+    authenticated body is never served to an anonymous request.
+    """
+
+    def __init__(self, directory: Path = CACHE_DIR):
+        self.directory = directory
+        self.stats = CacheStats()
+
+    def key(self, request) -> str:
+        auth = request.headers.get("Authorization", "")
+        material = "\n".join((request.method.upper(), request.url, hashlib.sha256(auth.encode()).hexdigest()))
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    def _paths(self, key: str):
+        folder = self.directory / key[:2]
+        return folder / f"{key}.json", folder / f"{key}.body"
+
+    def lookup(self, request, load_body: bool = True) -> Optional[Dict[str, Any]]:
+        """The cached entry; without load_body, restore() streams the body from disk instead"""
+        meta_path, body_path = self._paths(self.key(request))
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                entry = json.load(f)
+            if load_body:
+                entry["body"] = body_path.read_bytes()
+            elif not body_path.is_file():
+                return None
+        except (OSError, ValueError):
+            return None
+        entry["body_path"] = str(body_path)
+        return entry
+
+    def conditional_headers(self, entry: Dict[str, Any]) -> Dict[str, str]:
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, request, response) -> bool:
+        """Keep a 200 response that carries a validator; False when there is nothing to revalidate with"""
+        writer = self.writer(request, response)
+        if writer is None:
+            return False
+        writer.write(response.content or b"")
+        writer.commit()
+        return True
+
+    def writer(self, request, response) -> Optional[CacheWriter]:
+        """A writer for the body of a 200 that carries a validator, fed as the body is read; else None"""
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not (etag or last_modified) or "no-store" in response.headers.get("Cache-Control", ""):
+            return None
+        headers = {k: v for k, v in response.headers.items()
+                   if k.lower() not in ("content-encoding", "content-length", "transfer-encoding")}
+        entry = {
+            "url": request.url,
+            "status_code": response.status_code,
+            "etag": etag,
+            "last_modified": last_modified,
+            "headers": headers,
+            "encoding": response.encoding,
+        }
+        return CacheWriter(*self._paths(self.key(request)), entry)
+
+    def restore(self, entry: Dict[str, Any], not_modified) -> None:
+        """Turn a 304 into the cached 200, keeping headers the 304 refreshed"""
+        headers = CaseInsensitiveDict(entry["headers"])
+        for name, value in not_modified.headers.items():
+            if name.lower() not in ("content-length", "content-encoding", "transfer-encoding"):
+                headers[name] = value
+        not_modified.status_code = entry["status_code"]
+        not_modified.reason = "OK (revalidated)"
+        not_modified.headers = headers
+        # The 304 has no body to read: hand its connection back to the pool
+        if hasattr(not_modified.raw, "release_conn"):
+            not_modified.raw.drain_conn()
+            not_modified.raw.release_conn()
+        if "body" in entry:
+            not_modified._content = entry["body"]
+            not_modified._content_consumed = True
+        else:
+            not_modified.raw = open(entry["body_path"], "rb")
+            not_modified._content = False
+            not_modified._content_consumed = False
+        not_modified.encoding = entry.get("encoding")
+        not_modified.from_cache = True
+
+    def clear(self) -> None:
+        if not self.directory.exists():
+            return
+        for path in self.directory.rglob("*"):
+            if path.is_file():
+                path.unlink()
@@ -0,0 +1,613 @@
+"""
+Local stand-in for the WordPress REST API
+Serves every route in the endpoint catalogue (generated/endpoints.json) from
+in-memory synthetic data: paginated collections with X-WP-Total and
+X-WP-TotalPages, single items with 404s for unknown ids, 401s without
+credentials, OPTIONS schemas and /batch/v1. Items have the fields of the
+route's core controller (posts, users, terms, comments) plus the route's
+catalogued write args. Lets the generated suites, the
+load tests and the harness benchmarks run in CI without PHP.
+
+Usage:
+    python api-tests/mock_server.py                       # http://127.0.0.1:8000/wp-json
+    python api-tests/mock_server.py --port 8081 --items 500 --strict-auth
+"""
+
+import argparse
+import base64
+import json
+import re
+import sys
+import threading
+import uuid
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from catalogue import load_catalogue
+from config import APP_PASSWORD, USERNAME
+
+API_PREFIX = "/wp-json"
+DEFAULT_ITEMS = 25
+DEFAULT_PER_PAGE = 10
+MAX_PER_PAGE = 100
+MAX_BATCH = 25
+EPOCH = datetime(2024, 1, 1, 9, 0, 0)
+JSON_TYPE = "application/json; charset=UTF-8"
+
+Result = Tuple[int, Dict[str, str], Any]
+
+# Item shape of each core controller; without a catalogue the rest base decides
+CONTROLLER_SHAPES = {
+    "WP_REST_Posts_Controller": "post",
+    "WP_REST_Attachments_Controller": "post",
+    "WP_REST_Blocks_Controller": "post",
+    "WP_REST_Menu_Items_Controller": "post",
+    "WP_REST_Revisions_Controller": "post",
+    "WP_REST_Autosaves_Controller": "post",
+    "WP_REST_Users_Controller": "user",
+    "WP_REST_Terms_Controller": "term",
+    "WP_REST_Menus_Controller": "term",
+    "WP_REST_Comments_Controller": "comment",
+}
+BASE_SHAPES = {
+    "posts": "post", "pages": "post", "media": "post", "blocks": "post", "menu-items": "post",
+    "revisions": "post", "autosaves": "post",
+    "users": "user", "me": "user",
+    "application-passwords": "application_password",
+    "categories": "term", "tags": "term", "menus": "term",
+    "comments": "comment",
+}
+TAXONOMIES = {"categories": "category", "tags": "post_tag", "menus": "nav_menu"}
+NOT_FOUND = {
+    "post": ("rest_post_invalid_id", "Invalid post ID."),
+    "user": ("rest_user_invalid_id", "Invalid user ID."),
+    "term": ("rest_term_invalid", "Term does not exist."),
+    "comment": ("rest_comment_invalid_id", "Invalid comment ID."),
+    "application_password": ("application_password_not_found", "Could not find an application password with that id."),
+    "item": ("rest_not_found", "Item not found."),
+}
+# Shapes whose deletes without force=true only move the item to the trash
+TRASHABLE_SHAPES = frozenset({"post", "comment"})
+# Collections that start empty and are listed whole, like a new user's application passwords
+UNPAGED_SHAPES = frozenset({"application_password"})
+# Write args that are not fields of the item
+NON_FIELD_ARGS = frozenset({"id", "context", "force", "password", "reassign"})
+ARG_DEFAULTS = {"integer": 0, "number": 0.0, "boolean": False, "array": [], "object": {}}
+
+
+def error(status: int, code: str, message: str, **data) -> Result:
+    return status, {}, {"code": code, "message": message, "data": {"status": status, **data}}
+
+
+def default_entries() -> List[Dict[str, Any]]:
+    """Catalogue stand-in for when the generator has not exported one
+
+    The seedable collections, plus the current user and application password
+    routes the resource fixtures need (/batch/v1 is always served).
+    """
+    from seeder import SEED_KINDS
+    writable = ["GET", "HEAD", "POST", "PUT", "PATCH", "DELETE"]
+    entries = []
+    for kind in SEED_KINDS:
+        entries.append({"path": kind.path, "name": kind.name, "methods": ["GET", "HEAD", "POST"],
+                        "resource_type": "collection", "params": {}})
+        entries.append({"path": f"{kind.path}/{{id}}", "name": kind.name.rstrip("s"), "methods": writable,
+                        "resource_type": "single", "params": {"id": "integer"}})
+    passwords = "/wp/v2/users/{user_id}/application-passwords"
+    entries.extend([
+        {"path": "/wp/v2/users/me", "name": "me", "methods": ["GET", "HEAD"],
+         "resource_type": "collection", "params": {}},
+        {"path": passwords, "name": "application-passwords", "methods": ["GET", "HEAD", "POST", "DELETE"],
+         "resource_type": "collection", "params": {"user_id": "integer"},
+         "args": {"name": "string", "app_id": "string"}, "required": ["name"]},
+        {"path": f"{passwords}/{{uuid}}", "name": "application-password", "methods": writable,
+         "resource_type": "single", "params": {"user_id": "integer", "uuid": "string"}},
+    ])
+    return entries
+
+
+class MockRoute:
+    """A catalogue route compiled to a regex"""
+
+    def __init__(self, entry: Dict[str, Any]):
+        self.path = entry["path"]
+        self.name = entry.get("name", "")
+        self.methods = tuple(entry.get("methods") or ("GET", "HEAD"))
+        self.resource_type = entry.get("resource_type", "collection")
+        self.params: Dict[str, str] = dict(entry.get("params") or {})
+        self.args: Dict[str, str] = dict(entry.get("args") or {})
+        self.required: Tuple[str, ...] = tuple(entry.get("required") or ())
+        base = next((part for part in reversed(self.path.split("/")) if part and not part.startswith("{")), "")
+        self.shape = CONTROLLER_SHAPES.get(entry.get("controller", "")) or BASE_SHAPES.get(base, "item")
+        pattern = ""
+        for literal, param in re.findall(r"([^{]*)(?:\{(\w+)\})?", self.path):
+            pattern += re.escape(literal)
+            if param:
+                if self.params.get(param) == "integer":
+                    value = r"\d+"
+                elif self.path.endswith(f"{{{param}}}"):
+                    value = r"[^/]+"
+                else:
+                    # Names such as abilities' "core/get-site-info" contain slashes
+                    value = r".+?"
+                pattern += f"(?P<{param}>{value})"
+        self.regex = re.compile(f"^{pattern}/?$")
+        self.key_param = next(reversed(self.params), None) if self.path.endswith("}") else None
+
+    @property
+    def specificity(self) -> Tuple[int, int]:
+        # Literal routes win over parameterised ones, e.g. /users/me over /users/{id}
+        return (len(self.params), -len(self.path))
+
+
+class MockWordPress:
+    """Request dispatcher holding the synthetic data; thread-safe"""
+
+    def __init__(self, entries: Optional[List[Dict[str, Any]]] = None, items: int = DEFAULT_ITEMS,
+                 credentials: Optional[Tuple[str, str]] = None, site_name: str = "Mock WordPress"):
+        entries = entries if entries is not None else (load_catalogue() or default_entries())
+        self.routes = sorted((MockRoute(entry) for entry in entries), key=lambda r: r.specificity)
+        self.items = items
+        self.credentials = credentials
+        self.site_name = site_name
+        self.collections: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.next_id: Dict[str, int] = {}
+        self.requests = 0
+        self._match_cache: Dict[str, Optional[Tuple[MockRoute, Dict[str, str]]]] = {}
+        self._key_fields: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    # -- routing -------------------------------------------------------------
+
+    def match(self, path: str) -> Optional[Tuple[MockRoute, Dict[str, str]]]:
+        if path in self._match_cache:
+            return self._match_cache[path]
+        found = None
+        for route in self.routes:
+            m = route.regex.match(path)
+            if m:
+                found = (route, m.groupdict())
+                break
+        if len(self._match_cache) < 50000:
+            self._match_cache[path] = found
+        return found
+
+    def dispatch(self, method: str, target: str, body: Any = None, authorization: str = "",
+                 host: str = "127.0.0.1") -> Result:
+        """Handle one request; target is the path below /wp-json plus its query string"""
+        with self._lock:
+            self.requests += 1
+        url = urlsplit(target)
+        path = url.path.rstrip("/") or "/"
+        query = {key: values[-1] for key, values in parse_qs(url.query, keep_blank_values=True).items()}
+        method = method.upper()
+        if "rest_route" in query:
+            path = query.pop("rest_route").rstrip("/") or "/"
+
+        if path == "/":
+            return self._index(method, query)
+        denied = self._authenticate(authorization)
+        if denied:
+            return denied
+        if path == "/batch/v1" and method == "POST":
+            return self._batch(body, authorization, host)
+
+        found = self.match(path)
+        if found is None:
+            return error(404, "rest_no_route", "No route was found matching the URL and request method.")
+        route, params = found
+        if method == "OPTIONS":
+            return self._options(route, path, host)
+        if method not in route.methods:
+            return error(404, "rest_no_route", "No route was found matching the URL and request method.")
+
+        if route.resource_type == "collection":
+            if route.path.endswith("/users/me") and method in ("GET", "HEAD"):
+                # The current user, not a collection
+                return 200, {}, self._project(self._synthesise(route, path.rsplit("/", 1)[0], 1, host), query)
+            if method in ("GET", "HEAD"):
+                return self._list(route, path, query, host)
+            if method == "DELETE":
+                return self._delete_all(route, path, host)
+            return self._create(route, path, body, host)
+        if route.resource_type == "single" and route.key_param:
+            collection = path.rsplit("/", 1)[0]
+            key = params[route.key_param]
+            if method in ("GET", "HEAD"):
+                return self._get(route, collection, key, query, host)
+            if method == "DELETE":
+                return self._delete(route, collection, key, query, host)
+            return self._update(route, collection, key, body, host)
+        # Actions and singletons (settings, site health, ...) echo their input
+        return 200, {}, {"success": True, "route": route.path, "params": params, "input": body or {}}
+
+    def _authenticate(self, authorization: str) -> Optional[Result]:
+        if not authorization.startswith("Basic "):
+            return error(401, "rest_not_logged_in", "You are not currently logged in.")
+        if self.credentials is None:
+            return None
+        try:
+            username, _, password = base64.b64decode(authorization[6:]).decode("utf-8").partition(":")
+        except (ValueError, UnicodeDecodeError):
+            return error(401, "rest_authentication_failed", "Malformed Authorization header.")
+        if (username, password.replace(" ", "")) != (self.credentials[0], self.credentials[1].replace(" ", "")):
+            return error(401, "incorrect_password", "The provided password is an invalid application password.")
+        return None
+
+    # -- data ----------------------------------------------------------------
+
+    def _store(self, route: MockRoute, collection: str, host: str) -> Dict[str, Dict[str, Any]]:
+        """Items of a concrete collection path, synthesised on first use (caller holds the lock)"""
+        store = self.collections.get(collection)
+        if store is None:
+            store = self.collections[collection] = {}
+            count = 0 if route.shape in UNPAGED_SHAPES else self.items
+            for i in range(1, count + 1):
+                item = self._synthesise(route, collection, i, host)
+                store[str(item.get(self._key_field(route), i))] = item
+            self.next_id[collection] = count + 1
+        return store
+
+    def _key_field(self, route: MockRoute) -> str:
+        if route.resource_type == "single" and route.key_param:
+            return route.key_param
+        if route.path not in self._key_fields:
+            # A collection is keyed like the single route below it
+            self._key_fields[route.path] = next(
+                (other.key_param for other in self.routes
+                 if other.resource_type == "single" and other.key_param
+                 and other.path.rsplit("/", 1)[0] == route.path),
+                "id",
+            )
+        return self._key_fields[route.path]
+
+    def _synthesise(self, route: MockRoute, collection: str, i: int, host: str) -> Dict[str, Any]:
+        kind = collection.rstrip("/").rsplit("/", 1)[-1] or "item"
+        key_field = self._key_field(route)
+        key = i if key_field == "id" else f"{kind}-{i}"
+        item = getattr(self, f"_{route.shape}_fields")(kind, i, host)
+        for name, arg_type in route.args.items():
+            if name not in NON_FIELD_ARGS:
+                item.setdefault(name, ARG_DEFAULTS.get(arg_type, f"{name.replace('_', ' ')} {i}"))
+        # Shapes keyed by a field of their own (an application password's uuid) keep it
+        key = item.setdefault(key_field, key)
+        self._link(item, collection, key, host)
+        return item
+
+    @staticmethod
+    def _post_fields(kind: str, i: int, host: str) -> Dict[str, Any]:
+        created = (EPOCH + timedelta(hours=i)).isoformat()
+        return {
+            "id": i,
+            "date": created,
+            "date_gmt": created,
+            "modified": created,
+            "modified_gmt": created,
+            "slug": f"{kind}-{i}",
+            "status": "publish",
+            "type": kind,
+            "link": f"http://{host}/{kind}/{kind}-{i}/",
+            "title": {"rendered": f"{kind.replace('-', ' ').title()} {i}"},
+            "content": {"rendered": f"<p>Synthetic {kind} {i}.</p>", "protected": False},
+            "excerpt": {"rendered": f"<p>Synthetic {kind} {i}.</p>", "protected": False},
+            "author": 1,
+        }
+
+    @staticmethod
+    def _avatar_urls(seed: str) -> Dict[str, str]:
+        return {size: f"https://secure.gravatar.com/avatar/{seed}?s={size}&d=mm&r=g" for size in ("24", "48", "96")}
+
+    def _user_fields(self, kind: str, i: int, host: str) -> Dict[str, Any]:
+        return {
+            "id": i,
+            "name": f"User {i}",
+            "url": "",
+            "description": "",
+            "link": f"http://{host}/author/user-{i}/",
+            "slug": f"user-{i}",
+            "avatar_urls": self._avatar_urls(f"user-{i}"),
+            "meta": [],
+        }
+
+    @staticmethod
+    def _term_fields(kind: str, i: int, host: str) -> Dict[str, Any]:
+        taxonomy = TAXONOMIES.get(kind, kind)
+        item = {
+            "id": i,
+            "count": i % 5,
+            "description": "",
+            "link": f"http://{host}/{taxonomy}/{kind}-{i}/",
+            "name": f"{kind.replace('-', ' ').title()} {i}",
+            "slug": f"{kind}-{i}",
+            "taxonomy": taxonomy,
+            "meta": [],
+        }
+        if taxonomy == "category":
+            item["parent"] = 0
+        return item
+
+    def _comment_fields(self, kind: str, i: int, host: str) -> Dict[str, Any]:
+        created = (EPOCH + timedelta(hours=i)).isoformat()
+        return {
+            "id": i,
+            "post": i,
+            "parent": 0,
+            "author": 1,
+            "author_name": "admin",
+            "author_url": "",
+            "date": created,
+            "date_gmt": created,
+            "content": {"rendered": f"<p>Synthetic comment {i}.</p>"},
+            "link": f"http://{host}/?p={i}#comment-{i}",
+            "status": "approved",
+            "type": "comment",
+            "author_avatar_urls": self._avatar_urls("admin"),
+            "meta": [],
+        }
+
+    @staticmethod
+    def _application_password_fields(kind: str, i: int, host: str) -> Dict[str, Any]:
+        return {
+            "uuid": str(uuid.UUID(int=i)),
+            "app_id": "",
+            "name": f"Application password {i}",
+            "created": (EPOCH + timedelta(hours=i)).isoformat(),
+            "last_used": None,
+            "last_ip": None,
+        }
+
+    @staticmethod
+    def _item_fields(kind: str, i: int, host: str) -> Dict[str, Any]:
+        return {
+            "id": i,
+            "name": f"{kind.replace('-', ' ').title()} {i}",
+            "slug": f"{kind}-{i}",
+            "description": "",
+        }
+
+    def _link(self, item: Dict[str, Any], collection: str, key: Any, host: str) -> None:
+        base = f"http://{host}{API_PREFIX}"
+        item["_links"] = {
+            "self": [{"href": f"{base}{collection}/{key}"}],
+            "collection": [{"href": f"{base}{collection}"}],
+        }
+
+    @staticmethod
+    def _project(item: Dict[str, Any], query: Dict[str, str]) -> Dict[str, Any]:
+        fields = [f.strip().split(".", 1)[0] for f in query.get("_fields", "").split(",") if f.strip()]
+        return {k: v for k, v in item.items() if k in fields} if fields else item
+
+    def _list(self, route: MockRoute, collection: str, query: Dict[str, str], host: str) -> Result:
+        try:
+            per_page = int(query.get("per_page", DEFAULT_PER_PAGE))
+            page = int(query.get("page", 1))
+        except ValueError:
+            return error(400, "rest_invalid_param", "Invalid parameter(s): page, per_page",
+                         params={"per_page": "per_page is not of type integer."})
+        if not 1 <= per_page <= MAX_PER_PAGE:
+            return error(400, "rest_invalid_param", "Invalid parameter(s): per_page",
+                         params={"per_page": f"per_page must be between 1 (inclusive) and {MAX_PER_PAGE} (inclusive)"})
+        if page < 1:
+            return error(400, "rest_invalid_param", "Invalid parameter(s): page",
+                         params={"page": "page must be greater than or equal to 1"})
+        with self._lock:
+            items = list(self._store(route, collection, host).values())
+        if route.shape in UNPAGED_SHAPES:
+            return 200, {}, [self._project(item, query) for item in items]
+        total = len(items)
+        pages = max(1, -(-total // per_page)) if total else 0
+        if total and page > pages:
+            return error(400, "rest_post_invalid_page_number",
+                         "The page number requested is larger than the number of pages available.")
+        chunk = items[(page - 1) * per_page:page * per_page]
+        headers = {"X-WP-Total": str(total), "X-WP-TotalPages": str(pages)}
+        base = f"http://{host}{API_PREFIX}{collection}?per_page={per_page}"
+        links = []
+        if page > 1:
+            links.append(f'<{base}&page={page - 1}>; rel="prev"')
+        if page < pages:
+            links.append(f'<{base}&page={page + 1}>; rel="next"')
+        if links:
+            headers["Link"] = ", ".join(links)
+        return 200, headers, [self._project(item, query) for item in chunk]
+
+    def _get(self, route: MockRoute, collection: str, key: str, query: Dict[str, str], host: str) -> Result:
+        with self._lock:
+            item = self._store(route, collection, host).get(key)
+        if item is None:
+            return error(404, *NOT_FOUND[route.shape])
+        return 200, {}, self._project(item, query)
+
+    def _create(self, route: MockRoute, collection: str, body: Any, host: str) -> Result:
+        body = body if isinstance(body, dict) else {}
+        missing = [name for name in route.required if name not in body]
+        if missing:
+            return error(400, "rest_missing_callback_param", f"Missing parameter(s): {', '.join(missing)}",
+                         params=missing)
+        with self._lock:
+            store = self._store(route, collection, host)
+            i = self.next_id[collection]
+            self.next_id[collection] = i + 1
+            item = self._synthesise(route, collection, i, host)
+            item.update({k: v for k, v in body.items() if k not in NON_FIELD_ARGS and k != "_links"})
+            key_field = self._key_field(route)
+            if key_field != "id" and key_field in body:
+                self._link(item, collection, body[key_field], host)
+            store[str(item[key_field])] = item
+        return 201, {"Location": item["_links"]["self"][0]["href"]}, item
+
+    def _update(self, route: MockRoute, collection: str, key: str, body: Any, host: str) -> Result:
+        body = body if isinstance(body, dict) else {}
+        with self._lock:
+            item = self._store(route, collection, host).get(key)
+            if item is None:
+                return error(404, *NOT_FOUND[route.shape])
+            item.update({k: v for k, v in body.items()
+                         if k not in NON_FIELD_ARGS and k not in (route.key_param, "_links")})
+            if "modified" in item:
+                item["modified"] = item["modified_gmt"] = datetime.now().replace(microsecond=0).isoformat()
+            return 200, {}, dict(item)
+
+    def _delete(self, route: MockRoute, collection: str, key: str, query: Dict[str, str], host: str) -> Result:
+        with self._lock:
+            store = self._store(route, collection, host)
+            item = store.get(key)
+            if item is None:
+                return error(404, *NOT_FOUND[route.shape])
+            if query.get("force") in ("true", "1") or route.shape not in TRASHABLE_SHAPES:
+                del store[key]
+                return 200, {}, {"deleted": True, "previous": item}
+            item["status"] = "trash"
+            return 200, {}, dict(item)
+
+    def _delete_all(self, route: MockRoute, collection: str, host: str) -> Result:
+        """DELETE on a collection, as for a user's application passwords"""
+        with self._lock:
+            store = self._store(route, collection, host)
+            count = len(store)
+            store.clear()
+        return 200, {}, {"deleted": True, "count": count}
+
+    # -- metadata ------------------------------------------------------------
+
+    def _index(self, method: str, query: Dict[str, str]) -> Result:
+        namespaces = sorted({"/".join(route.path.strip("/").split("/")[:2]) for route in self.routes})
+        index = {
+            "name": self.site_name,
+            "description": "Synthetic WordPress REST API",
+            "url": "",
+            "namespaces": namespaces,
+            "routes": {route.path: {"methods": list(route.methods)} for route in self.routes},
+        }
+        return 200, {}, self._project(index, query)
+
+    def _options(self, route: MockRoute, path: str, host: str) -> Result:
+        sample = self._synthesise(route, path if route.resource_type == "collection" else path.rsplit("/", 1)[0], 1, host)
+        types = {bool: "boolean", int: "integer", float: "number", str: "string", dict: "object", list: "array"}
+        schema = {
+            "$schema": "http://json-schema.org/draft-04/schema#",
+            "title": route.name,
+            "type": "object",
+            "properties": {key: {"type": types.get(type(value), "string")} for key, value in sample.items()
+                           if key != "_links"},
+        }
+        args = {name: {"type": kind} for name, kind in {**route.args, **route.params}.items()}
+        endpoints = [{"methods": list(route.methods), "args": args}]
+        return 200, {"Allow": ", ".join(route.methods)}, {
+            "namespace": "/".join(route.path.strip("/").split("/")[:2]),
+            "methods": list(route.methods),
+            "endpoints": endpoints,
+            "schema": schema,
+        }
+
+    def _batch(self, body: Any, authorization: str, host: str) -> Result:
+        requests = body.get("requests") if isinstance(body, dict) else None
+        if not isinstance(requests, list):
+            return error(400, "rest_missing_callback_param", "Missing parameter(s): requests")
+        if len(requests) > MAX_BATCH:
+            return error(400, "rest_invalid_param", "Invalid parameter(s): requests",
+                         params={"requests": f"requests must contain at most {MAX_BATCH} items."})
+        responses = []
+        for sub in requests:
+            status, headers, payload = self.dispatch(sub.get("method", "POST"), sub.get("path", ""),
+                                                     sub.get("body"), authorization, host)
+            responses.append({"status": status, "headers": headers, "body": payload})
+        return 207, {}, {"responses": responses}
+
+
+def make_handler(app: MockWordPress, verbose: bool = False):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        server_version = "MockWordPress"
+        # Headers and body go out in separate writes; without this, keep-alive
+        # clients wait on delayed ACKs for ~40ms per response
+        disable_nagle_algorithm = True
+
+        def _handle(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+            body = None
+            if raw:
+                content_type = self.headers.get("Content-Type", "")
+                try:
+                    if "json" in content_type:
+                        body = json.loads(raw)
+                    else:
+                        body = {k: v[-1] for k, v in parse_qs(raw.decode("utf-8")).items()}
+                except (ValueError, UnicodeDecodeError):
+                    self._send(*error(400, "rest_invalid_json", "Invalid JSON body passed."))
+                    return
+            path = self.path
+            if path.startswith(API_PREFIX):
+                target = path[len(API_PREFIX):] or "/"
+            elif "rest_route=" in path:
+                target = path
+            else:
+                self._send(404, {}, {"code": "not_found", "message": "Not a REST API URL."})
+                return
+            self._send(*app.dispatch(self.command, target, body, self.headers.get("Authorization", ""),
+                                     self.headers.get("Host", "127.0.0.1")))
+
+        def _send(self, status: int, headers: Dict[str, str], payload: Any):
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", JSON_TYPE)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(data)
+
+        do_GET = do_HEAD = do_POST = do_PUT = do_PATCH = do_DELETE = do_OPTIONS = _handle
+
+        def log_message(self, format, *args):
+            if verbose:
+                super().log_message(format, *args)
+
+    return Handler
+
+
+class MockServer(ThreadingHTTPServer):
+    """Threaded server with a deep accept backlog for high-concurrency clients"""
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+def start(host: str = "127.0.0.1", port: int = 0, app: Optional[MockWordPress] = None,
+          verbose: bool = False) -> Tuple[MockServer, str]:
+    """Serve in a background thread; returns the server and its REST base URL"""
+    app = app or MockWordPress()
+    server = MockServer((host, port), make_handler(app, verbose))
+    server.app = app
+    threading.Thread(target=server.serve_forever, name="mock-wordpress", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}{API_PREFIX}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the catalogued REST routes from synthetic data")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--items", type=int, default=DEFAULT_ITEMS, help="items per collection")
+    parser.add_argument("--strict-auth", action="store_true",
+                        help="only accept config.USERNAME / config.APP_PASSWORD (default: any Basic credentials)")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args()
+
+    app = MockWordPress(items=args.items, credentials=(USERNAME, APP_PASSWORD) if args.strict_auth else None)
+    server = MockServer((args.host, args.port), make_handler(app, args.verbose))
+    source = "endpoint catalogue" if load_catalogue() else "seedable collections (no catalogue exported yet)"
+    print(f"Serving {len(app.routes)} routes from the {source} at http://{args.host}:{args.port}{API_PREFIX}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
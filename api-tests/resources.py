@@ -0,0 +1,259 @@
+"""
+Per-test resource lifecycle for write tests
+Tests that create WordPress objects get them from a ResourceScope (the
+wp_resources fixture): names are unique per worker and per run, so parallel
+workers never collide, and everything the scope created is deleted when the
+test ends, newest first. Each worker also keeps a ledger of what is still
+alive, so objects left behind by an interrupted run are deleted the next time
+that worker starts.
+
+    def test_update_user(wp_resources):
+        user = wp_resources.user()
+        response = requests.post(f"{BASE_URL}/wp/v2/users/{user['id']}", json={"name": "x"}, auth=auth)
+"""
+
+import json
+import os
+import secrets
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import requests
+from requests.auth import HTTPBasicAuth
+
+from batch import BatchClient, BatchError
+from config import APP_PASSWORD, BASE_URL, USERNAME
+
+LEDGER_DIR = Path(__file__).parent / ".resources"
+DELETE_PARAMS = {"force": "true"}
+
+
+class ResourceError(Exception):
+    """A resource a test depends on could not be created
+
+    Connection errors are not wrapped, so suites keep skipping on an
+    unreachable server.
+    """
+
+    def __init__(self, message: str, response=None):
+        super().__init__(message)
+        self.response = response
+
+
+def worker_id() -> str:
+    """pytest-xdist worker id (gw0, gw1, ...), or 'main' when not distributed"""
+    return os.environ.get("PYTEST_XDIST_WORKER", "main")
+
+
+class ResourceTracker:
+    """Everything one worker has created and not yet deleted, mirrored to its ledger file"""
+
+    def __init__(self, base_url: str = BASE_URL, auth=None, worker: Optional[str] = None,
+                 ledger_dir: Path = LEDGER_DIR):
+        self.base_url = base_url.rstrip("/")
+        self.auth = auth if auth is not None else HTTPBasicAuth(USERNAME, APP_PASSWORD)
+        self.worker = worker or worker_id()
+        self.prefix = f"wp-api-{self.worker}-{secrets.token_hex(3)}"
+        self.ledger_path = ledger_dir / f"{self.worker}.json"
+        self.alive: List[str] = self._load()
+        self.created = 0
+        self.deleted = 0
+        self.leaked: List[str] = []
+        self._counter = 0
+        self._admin_id: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> List[str]:
+        try:
+            with open(self.ledger_path, encoding="utf-8") as f:
+                return list(json.load(f).get("alive", []))
+        except (OSError, ValueError):
+            return []
+
+    def _save(self) -> None:
+        if not self.alive:
+            self.ledger_path.unlink(missing_ok=True)
+            return
+        self.ledger_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.ledger_path, "w", encoding="utf-8") as f:
+            json.dump({"worker": self.worker, "alive": self.alive}, f, indent=2)
+
+    def unique_name(self, label: str) -> str:
+        """e.g. wp-api-gw1-3fa9c2-user-4: unique across workers, runs and calls"""
+        with self._lock:
+            self._counter += 1
+            return f"{self.prefix}-{label}-{self._counter}"
+
+    def track(self, delete_path: str) -> None:
+        """Record a resource by the path (with query) that deletes it"""
+        with self._lock:
+            self.alive.append(delete_path)
+            self.created += 1
+            self._save()
+
+    def forget(self, delete_path: str) -> None:
+        """The test deleted the resource itself"""
+        with self._lock:
+            if delete_path in self.alive:
+                self.alive.remove(delete_path)
+                self._save()
+
+    def delete(self, delete_paths: List[str]) -> int:
+        """Delete the given resources, newest first; returns how many are gone"""
+        gone = 0
+        for path in reversed(delete_paths):
+            try:
+                response = requests.delete(f"{self.base_url}{path}", auth=self.auth, timeout=30)
+                status = response.status_code
+            except requests.exceptions.RequestException:
+                status = 0
+            # 404/410: already deleted by the test or by a cascading delete (a user's passwords)
+            if status in (200, 204, 404, 410):
+                gone += 1
+                self.forget(path)
+                with self._lock:
+                    if path in self.leaked:
+                        self.leaked.remove(path)
+            else:
+                with self._lock:
+                    if path not in self.leaked:
+                        self.leaked.append(path)
+        with self._lock:
+            self.deleted += gone
+        return gone
+
+    def sweep(self) -> int:
+        """Delete what an interrupted earlier run of this worker left behind"""
+        with self._lock:
+            leftovers = list(self.alive)
+        return self.delete(leftovers) if leftovers else 0
+
+    def scope(self) -> "ResourceScope":
+        return ResourceScope(self)
+
+    def admin_id(self) -> int:
+        """Id of the user the suites authenticate as"""
+        if self._admin_id is None:
+            response = requests.get(f"{self.base_url}/wp/v2/users/me", auth=self.auth, timeout=10)
+            try:
+                self._admin_id = response.json()["id"]
+            except (ValueError, KeyError, TypeError):
+                raise ResourceError(f"GET /wp/v2/users/me returned {response.status_code}", response)
+        return self._admin_id
+
+    def counts(self) -> Dict[str, Any]:
+        return {"created": self.created, "deleted": self.deleted, "leaked": list(self.leaked)}
+
+    @staticmethod
+    def combine(counts: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Add up the counts of several processes (pytest-xdist workers)"""
+        return {
+            "created": sum(c["created"] for c in counts),
+            "deleted": sum(c["deleted"] for c in counts),
+            "leaked": [path for c in counts for path in c["leaked"]],
+        }
+
+    @staticmethod
+    def report(counts: Dict[str, Any]) -> List[str]:
+        if not counts["created"] and not counts["deleted"]:
+            return []
+        lines = [f"test resources: {counts['created']} created, {counts['deleted']} deleted, "
+                 f"{len(counts['leaked'])} could not be deleted"]
+        lines.extend(f"  left behind: {path}" for path in counts["leaked"][:5])
+        if counts["leaked"]:
+            lines.append(f"  (retried when the same worker next runs; ledgers in {LEDGER_DIR})")
+        return lines
+
+
+class ResourceScope:
+    """Resources created for one test; used as a context manager, deleted on exit"""
+
+    def __init__(self, tracker: ResourceTracker):
+        self.tracker = tracker
+        self.created: List[str] = []
+
+    def __enter__(self) -> "ResourceScope":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> int:
+        created, self.created = self.created, []
+        return self.tracker.delete(created)
+
+    def name(self, label: str) -> str:
+        return self.tracker.unique_name(label)
+
+    def track(self, delete_path: str) -> None:
+        self.tracker.track(delete_path)
+        self.created.append(delete_path)
+
+    def forget(self, delete_path: str) -> None:
+        self.tracker.forget(delete_path)
+        if delete_path in self.created:
+            self.created.remove(delete_path)
+
+    def create(self, path: str, payload: Dict[str, Any], id_field: str = "id",
+               delete_params: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """POST payload to path and track the result for deletion; returns the created object"""
+        try:
+            response = requests.post(f"{self.tracker.base_url}{path}", json=payload,
+                                     auth=self.tracker.auth, timeout=30)
+        except requests.exceptions.ConnectionError:
+            raise
+        except requests.exceptions.RequestException as e:
+            raise ResourceError(f"POST {path} failed: {e}") from e
+        try:
+            body = response.json()
+        except ValueError:
+            body = response.text
+        return self._created(path, response, body, id_field, delete_params)
+
+    def create_many(self, path: str, payloads: List[Dict[str, Any]], id_field: str = "id",
+                    delete_params: Optional[Dict[str, str]] = None,
+                    batch: Optional[BatchClient] = None) -> List[Dict[str, Any]]:
+        """Like create() for several payloads, sent through /batch/v1 (batch, or a new client)"""
+        client = batch if batch is not None else BatchClient(self.tracker.base_url, auth=self.tracker.auth)
+        futures = [client.post(path, payload) for payload in payloads]
+        client.flush()
+        created = []
+        for future in futures:
+            try:
+                response = future.result()
+            except requests.exceptions.ConnectionError:
+                raise
+            except (BatchError, requests.exceptions.RequestException) as e:
+                raise ResourceError(f"POST {path} failed: {e}") from e
+            created.append(self._created(path, response, response.json(), id_field, delete_params))
+        return created
+
+    def _created(self, path: str, response, body: Any, id_field: str,
+                 delete_params: Optional[Dict[str, str]]) -> Dict[str, Any]:
+        """Check a create response and track the object for deletion"""
+        if response.status_code not in (200, 201) or not isinstance(body, dict) or id_field not in body:
+            raise ResourceError(f"POST {path} returned {response.status_code}: {str(body)[:200]}", response)
+        params = DELETE_PARAMS if delete_params is None else delete_params
+        query = "&".join(f"{key}={value}" for key, value in params.items())
+        self.track(f"{path}/{body[id_field]}" + (f"?{query}" if query else ""))
+        return body
+
+    def user(self, **fields) -> Dict[str, Any]:
+        """A throwaway user; its posts are reassigned to the admin when it is deleted"""
+        name = self.name("user")
+        payload = {"username": name, "email": f"{name}@example.com",
+                   "password": secrets.token_urlsafe(16), **fields}
+        reassign = str(self.tracker.admin_id())
+        return self.create("/wp/v2/users", payload, delete_params=dict(DELETE_PARAMS, reassign=reassign))
+
+    def application_password(self, user_id: int, **fields) -> Dict[str, Any]:
+        payload = {"name": self.name("app-password"), **fields}
+        return self.create(f"/wp/v2/users/{user_id}/application-passwords", payload,
+                           id_field="uuid", delete_params={})
+
+    def application_passwords(self, user_id: int, count: int,
+                              batch: Optional[BatchClient] = None) -> List[Dict[str, Any]]:
+        payloads = [{"name": self.name("app-password")} for _ in range(count)]
+        return self.create_many(f"/wp/v2/users/{user_id}/application-passwords", payloads,
+                                id_field="uuid", delete_params={}, batch=batch)
@@ -0,0 +1,268 @@
+"""
+Fixture data seeder
+Bulk-creates users, terms, menus, posts, pages and comments before a run so the
+single-item tests have something to fetch, and deletes them again afterwards.
+Writes go through /batch/v1 where the route allows it and fall back to
+concurrent single requests where it does not.
+"""
+
+import json
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+from requests.auth import HTTPBasicAuth
+
+from batch import MAX_BATCH_SIZE, BatchClient, BatchError
+from catalogue import collection_paths, load_catalogue
+from config import APP_PASSWORD, BASE_URL, MAX_CONCURRENCY, SEED_COUNTS, USERNAME
+
+MANIFEST_FILE = Path(__file__).parent / ".seed-manifest.json"
+
+Payload = Callable[[int, str, Dict[str, List[int]]], Dict[str, Any]]
+
+
+class SeedError(Exception):
+    """Seed data could not be created or removed"""
+
+    def __init__(self, message: str, response=None):
+        super().__init__(message)
+        self.response = response
+
+
+def _pick(ids: List[int], i: int) -> List[int]:
+    return [ids[i % len(ids)]] if ids else []
+
+
+@dataclass(frozen=True)
+class SeedKind:
+    """A collection to seed: where it lives and how to build item number i
+
+    requires names kinds that must have seeded at least one item first; the
+    kind is skipped otherwise.
+    """
+    name: str
+    path: str
+    payload: Payload
+    delete_params: Dict[str, str] = field(default_factory=lambda: {"force": "true"})
+    requires: Tuple[str, ...] = ()
+
+
+# In dependency order: posts use the seeded terms, comments the seeded posts
+SEED_KINDS = [
+    SeedKind("users", "/wp/v2/users", lambda i, prefix, seeded: {
+        "username": f"{prefix}-user-{i}",
+        "email": f"{prefix}-user-{i}@example.com",
+        "password": secrets.token_urlsafe(16),
+    }),
+    SeedKind("categories", "/wp/v2/categories", lambda i, prefix, seeded: {
+        "name": f"{prefix} category {i}",
+    }),
+    SeedKind("tags", "/wp/v2/tags", lambda i, prefix, seeded: {
+        "name": f"{prefix} tag {i}",
+    }),
+    SeedKind("menus", "/wp/v2/menus", lambda i, prefix, seeded: {
+        "name": f"{prefix} menu {i}",
+    }),
+    SeedKind("posts", "/wp/v2/posts", lambda i, prefix, seeded: {
+        "title": f"{prefix} post {i}",
+        "content": f"Seeded post {i} for the REST API tests.",
+        "status": "publish",
+        "categories": _pick(seeded.get("categories", []), i),
+        "tags": _pick(seeded.get("tags", []), i),
+    }),
+    SeedKind("pages", "/wp/v2/pages", lambda i, prefix, seeded: {
+        "title": f"{prefix} page {i}",
+        "content": f"Seeded page {i} for the REST API tests.",
+        "status": "publish",
+    }),
+    SeedKind("comments", "/wp/v2/comments", lambda i, prefix, seeded: {
+        "post": _pick(seeded["posts"], i)[0],
+        "content": f"{prefix} comment {i}",
+        "status": "approve",
+    }, requires=("posts",)),
+]
+
+
+def load_manifest(path: Path = MANIFEST_FILE) -> Dict[str, Any]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest: Dict[str, Any], path: Path = MANIFEST_FILE) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+
+class Seeder:
+    """Creates and removes seed data, recording every created id in a manifest
+
+    The manifest is written after each resource, so data left behind by an
+    interrupted run is still removed by the next teardown.
+    """
+
+    def __init__(self, base_url: str = BASE_URL, auth=None, counts: Optional[Dict[str, int]] = None,
+                 scale: float = 1.0, manifest_path: Path = MANIFEST_FILE, workers: int = MAX_CONCURRENCY):
+        self.base_url = base_url.rstrip("/")
+        self.auth = auth if auth is not None else HTTPBasicAuth(USERNAME, APP_PASSWORD)
+        self.counts = {name: max(0, round(count * scale)) for name, count in (counts or SEED_COUNTS).items()}
+        self.manifest_path = manifest_path
+        self.workers = max(1, workers)
+        self.prefix = f"wp-api-seed-{int(time.time())}"
+        self.manifest = load_manifest(manifest_path)
+        self.manifest.setdefault("created", {})
+        self.errors: Dict[str, int] = {}
+        self.skipped: List[str] = []
+
+    def kinds(self) -> List[SeedKind]:
+        """Seed kinds in dependency order, limited to collections the catalogue knows"""
+        known = set(collection_paths(load_catalogue()))
+        return [
+            kind for kind in SEED_KINDS
+            if self.counts.get(kind.name) and (not known or kind.path in known)
+        ]
+
+    def seed(self) -> Dict[str, List[int]]:
+        """Create everything; returns created ids by resource name"""
+        seeded: Dict[str, List[int]] = {}
+        for kind in self.kinds():
+            ids = self.create(kind, self.counts[kind.name], seeded)
+            if kind.name not in self.skipped:
+                seeded[kind.name] = ids
+        return seeded
+
+    def recorded(self) -> Dict[str, List[int]]:
+        """Ids in the manifest, by resource name"""
+        created = self.manifest["created"]
+        return {kind.name: list(created[kind.path]) for kind in SEED_KINDS if created.get(kind.path)}
+
+    def create(self, kind: SeedKind, count: int, seeded: Optional[Dict[str, List[int]]] = None,
+               start: int = 0) -> List[int]:
+        """Create count items of one kind (numbered from start) and record them
+
+        seeded defaults to everything in the manifest. Nothing is created, and
+        the kind is listed in skipped, when a kind it requires has no items.
+        """
+        seeded = self.recorded() if seeded is None else seeded
+        if not all(seeded.get(name) for name in kind.requires):
+            if kind.name not in self.skipped:
+                self.skipped.append(kind.name)
+            return []
+        payloads = [kind.payload(i, self.prefix, seeded) for i in range(start, start + count)]
+        ids = self._create(kind, payloads)
+        self.manifest["created"].setdefault(kind.path, []).extend(ids)
+        save_manifest(self.manifest, self.manifest_path)
+        return ids
+
+    def teardown(self) -> int:
+        """Delete everything in the manifest, newest resource first; returns items deleted
+
+        Users are kept in the manifest, for the next teardown, when the id to
+        reassign their content to cannot be looked up.
+        """
+        deleted = 0
+        created = self.manifest.get("created", {})
+        for kind in reversed(SEED_KINDS):
+            ids = created.get(kind.path)
+            if not ids:
+                continue
+            params = dict(kind.delete_params)
+            if kind.name == "users":
+                try:
+                    params["reassign"] = str(self._current_user_id())
+                except (SeedError, requests.exceptions.RequestException):
+                    self.errors[kind.name] = self.errors.get(kind.name, 0) + len(ids)
+                    continue
+            query = "&".join(f"{key}={value}" for key, value in params.items())
+            gone = self._delete(kind, [f"{kind.path}/{item_id}?{query}" for item_id in ids])
+            deleted += len(gone)
+            created[kind.path] = [item_id for item_id in ids if item_id not in gone]
+            if not created[kind.path]:
+                del created[kind.path]
+        if created:
+            save_manifest(self.manifest, self.manifest_path)
+        else:
+            self.manifest_path.unlink(missing_ok=True)
+        return deleted
+
+    def _create(self, kind: SeedKind, payloads: List[Dict[str, Any]]) -> List[int]:
+        chunks = [payloads[i:i + MAX_BATCH_SIZE] for i in range(0, len(payloads), MAX_BATCH_SIZE)]
+        if not chunks:
+            return []
+
+        # The first chunk tells us whether the route opted in to batching
+        first = self._batch(kind, "POST", [(kind.path, payload) for payload in chunks[0]])
+        if first is None:
+            with ThreadPoolExecutor(self.workers) as pool:
+                responses = list(pool.map(lambda p: self._single("POST", kind.path, p), payloads))
+        else:
+            with ThreadPoolExecutor(self.workers) as pool:
+                rest = pool.map(lambda c: self._batch(kind, "POST", [(kind.path, p) for p in c]) or [], chunks[1:])
+                responses = first + [r for chunk in rest for r in chunk]
+
+        ids = []
+        for status, body in responses:
+            if status in (200, 201) and isinstance(body, dict) and "id" in body:
+                ids.append(body["id"])
+            else:
+                self.errors[kind.name] = self.errors.get(kind.name, 0) + 1
+        return ids
+
+    def _delete(self, kind: SeedKind, paths: List[str]) -> set:
+        chunks = [paths[i:i + MAX_BATCH_SIZE] for i in range(0, len(paths), MAX_BATCH_SIZE)]
+        first = self._batch(kind, "DELETE", [(path, None) for path in chunks[0]])
+        with ThreadPoolExecutor(self.workers) as pool:
+            if first is None:
+                responses = list(pool.map(lambda path: self._single("DELETE", path), paths))
+            else:
+                rest = pool.map(lambda c: self._batch(kind, "DELETE", [(path, None) for path in c]) or [], chunks[1:])
+                responses = first + [r for chunk in rest for r in chunk]
+        gone = set()
+        for path, (status, _) in zip(paths, responses):
+            # 404/410: already deleted by hand or by a cascading delete
+            if status in (200, 404, 410):
+                gone.add(int(path.split("?")[0].rsplit("/", 1)[1]))
+        return gone
+
+    def _batch(self, kind: SeedKind, method: str, operations) -> Optional[List]:
+        """Send one batch; None when the route does not allow batching"""
+        # Refusals come back to us: _create and _delete fall back to concurrent single requests
+        client = BatchClient(self.base_url, auth=self.auth, resend_not_allowed=False)
+        futures = [client.queue(method, path, body) for path, body in operations]
+        client.flush()
+        results = []
+        for future in futures:
+            try:
+                response = future.result()
+            except (BatchError, requests.exceptions.RequestException):
+                results.append((0, None))
+                continue
+            body = response.json()
+            if isinstance(body, dict) and body.get("code") == "rest_batch_not_allowed":
+                return None
+            results.append((response.status_code, body))
+        return results
+
+    def _single(self, method: str, path: str, body: Optional[Dict[str, Any]] = None):
+        try:
+            response = requests.request(method, f"{self.base_url}{path}", json=body, auth=self.auth, timeout=30)
+        except requests.exceptions.RequestException:
+            return (0, None)
+        try:
+            return (response.status_code, response.json())
+        except ValueError:
+            return (response.status_code, None)
+
+    def _current_user_id(self) -> int:
+        response = requests.get(f"{self.base_url}/wp/v2/users/me", auth=self.auth, timeout=10)
+        try:
+            return response.json()["id"]
+        except (ValueError, KeyError, TypeError):
+            raise SeedError(f"GET /wp/v2/users/me returned {response.status_code}", response)
@@ -0,0 +1,161 @@
+"""
+Duration-aware sharding for the API test suites
+Packs test modules onto workers using the timings recorded by previous runs,
+so every pytest-xdist worker (or CI shard) finishes at about the same time
+"""
+
+import heapq
+import json
+import re
+import statistics
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import pytest
+
+DURATIONS_FILE = Path(__file__).parent / ".test-durations.json"
+
+# Weight of the latest run when updating the recorded history
+DURATION_SMOOTHING = 0.5
+DEFAULT_DURATION = 1.0
+
+
+def load_durations(path: Path = DURATIONS_FILE) -> Dict[str, float]:
+    """Load recorded per-test durations (seconds) keyed by test id"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {key: float(value) for key, value in data.items() if isinstance(value, (int, float))}
+
+
+def save_durations(durations: Dict[str, float], path: Path = DURATIONS_FILE) -> None:
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(dict(sorted(durations.items())), f, indent=2)
+    tmp_path.replace(path)
+
+
+def merge_durations(history: Dict[str, float], measured: Dict[str, float]) -> Dict[str, float]:
+    """Blend the latest measurements into the history"""
+    merged = dict(history)
+    for key, seconds in measured.items():
+        if key in merged:
+            merged[key] = DURATION_SMOOTHING * seconds + (1 - DURATION_SMOOTHING) * merged[key]
+        else:
+            merged[key] = seconds
+    return merged
+
+
+def history_key(rootpath: Path, nodeid: str) -> str:
+    """Test id relative to this directory, so history is shared across invocation dirs"""
+    # Drop the "@group" suffix pytest-xdist appends under --dist loadgroup
+    nodeid = re.sub(r"@[^\]@]*$", "", nodeid)
+    path, sep, rest = nodeid.partition("::")
+    try:
+        path = (rootpath / path).resolve().relative_to(Path(__file__).parent.resolve()).as_posix()
+    except ValueError:
+        pass
+    return f"{path}{sep}{rest}"
+
+
+def plan_shards(costs: Dict[str, float], shard_count: int) -> List[List[str]]:
+    """Longest-processing-time bin packing: biggest unit first onto the least loaded shard"""
+    shards = [[] for _ in range(shard_count)]
+    heap = [(0.0, index) for index in range(shard_count)]
+    for unit, cost in sorted(costs.items(), key=lambda kv: (-kv[1], kv[0])):
+        load, index = heapq.heappop(heap)
+        shards[index].append(unit)
+        heapq.heappush(heap, (load + cost, index))
+    return shards
+
+
+def add_options(parser) -> None:
+    group = parser.getgroup("sharding", "duration-aware sharding")
+    group.addoption("--shard-count", type=int, default=0,
+                    help="split the suite into this many shards (e.g. one per CI job)")
+    group.addoption("--shard-index", type=int, default=0,
+                    help="0-based shard to run together with --shard-count")
+    group.addoption("--no-shard-balance", action="store_true", default=False,
+                    help="keep pytest-xdist's default scheduling")
+    group.addoption("--no-record-durations", action="store_true", default=False,
+                    help="do not update %s" % DURATIONS_FILE.name)
+
+
+class ShardingPlugin:
+    """Bin-packs modules across workers/shards and records durations after the run"""
+
+    def __init__(self, config):
+        self.config = config
+        self.history = load_durations()
+        self.measured: Dict[str, float] = {}
+        self.skipped = set()
+        self.is_worker = hasattr(config, "workerinput")
+
+        # Each bin becomes an xdist_group, which only loadgroup scheduling honours
+        if (not config.getoption("no_shard_balance")
+                and getattr(config.option, "dist", "no") == "load"
+                and config.getoption("shard_count") == 0):
+            config.option.dist = "loadgroup"
+
+    def _module_costs(self, items) -> Tuple[Dict[str, float], Dict[str, List]]:
+        """Modules are packed as a whole because hand-written suites share module state"""
+        known = list(self.history.values())
+        default = statistics.median(known) if known else DEFAULT_DURATION
+        costs: Dict[str, float] = {}
+        modules: Dict[str, List] = {}
+        for item in items:
+            module = item.nodeid.split("::", 1)[0]
+            key = history_key(self.config.rootpath, item.nodeid)
+            costs[module] = costs.get(module, 0.0) + self.history.get(key, default)
+            modules.setdefault(module, []).append(item)
+        return costs, modules
+
+    # Must run before pytest-xdist's worker hook, which reads the xdist_group marks
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_collection_modifyitems(self, config, items):
+        shard_count = config.getoption("shard_count")
+        if shard_count:
+            shard_index = config.getoption("shard_index")
+            if not 0 <= shard_index < shard_count:
+                raise pytest.UsageError("--shard-index must be between 0 and --shard-count - 1")
+            costs, modules = self._module_costs(items)
+            selected = set(plan_shards(costs, shard_count)[shard_index])
+            keep = [item for item in items if item.nodeid.split("::", 1)[0] in selected]
+            deselected = [item for item in items if item.nodeid.split("::", 1)[0] not in selected]
+            if deselected:
+                config.hook.pytest_deselected(items=deselected)
+                items[:] = keep
+            return
+
+        if self.is_worker and getattr(config.option, "dist", "no") == "loadgroup":
+            worker_count = config.workerinput["workercount"]
+            costs, modules = self._module_costs(items)
+            for index, shard in enumerate(plan_shards(costs, worker_count)):
+                for module in shard:
+                    for item in modules[module]:
+                        if not item.get_closest_marker("xdist_group"):
+                            item.add_marker(pytest.mark.xdist_group(name=f"shard-{index}"))
+
+    def pytest_runtest_logreport(self, report):
+        if self.is_worker:
+            return
+        key = history_key(self.config.rootpath, report.nodeid)
+        # Skipped tests (e.g. server not running) say nothing about real cost
+        if report.skipped:
+            self.skipped.add(key)
+        self.measured[key] = self.measured.get(key, 0.0) + report.duration
+
+    def pytest_sessionfinish(self, session):
+        for key in self.skipped:
+            self.measured.pop(key, None)
+        if self.is_worker or not self.measured or self.config.getoption("no_record_durations"):
+            return
+        save_durations(merge_durations(self.history, self.measured))
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if self.measured and not self.config.getoption("no_record_durations"):
+            terminalreporter.write_line(
+                f"sharding: recorded durations for {len(self.measured)} tests in {DURATIONS_FILE}"
+            )
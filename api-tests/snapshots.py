@@ -0,0 +1,203 @@
+"""
+Snapshot diffing for saved API responses
+Compares each response artifact with the one the previous run stored and
+reports structural changes per endpoint: keys added or removed, values that
+changed type, lists that changed length. Volatile values (dates, nonces, the
+host in links) are normalised away first, so a re-run against a different
+site or on a different day only reports real API changes.
+
+Only artifacts whose content hash changed are read, so a run where nothing
+changed costs nothing.
+
+Usage:
+    python api-tests/snapshots.py                  # last recorded change of every artifact
+    python api-tests/snapshots.py --values         # include changed values, not just structure
+"""
+
+import argparse
+import json
+import re
+import sys
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+from artifacts import ArtifactStore
+
+VOLATILE_KEYS = frozenset({
+    "date", "date_gmt", "modified", "modified_gmt", "nonce",
+    "last_used", "last_ip", "created", "password", "uuid",
+})
+VOLATILE_SUFFIXES = ("_nonce", "_date", "_gmt")
+DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}")
+HOST_RE = re.compile(r"https?://[^/\s\"']+")
+# Changes reported per artifact; a reshaped collection can change every item
+MAX_CHANGES = 20
+
+
+@dataclass
+class Change:
+    kind: str   # added, removed, type, length, value
+    path: str
+    detail: str = ""
+
+    def describe(self) -> str:
+        return f"{self.kind:<7} {self.path or '$'}" + (f"  {self.detail}" if self.detail else "")
+
+
+@dataclass
+class SnapshotDiff:
+    key: str
+    changes: List[Change] = field(default_factory=list)
+    truncated: int = 0
+
+    @property
+    def endpoint(self) -> str:
+        return self.key.split("/", 1)[0]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SnapshotDiff":
+        return cls(data["key"], [Change(**change) for change in data["changes"]], data.get("truncated", 0))
+
+
+def parse_snapshot(data: bytes) -> Any:
+    """Decode an artifact: JSON, or the generated 'Status/Headers/Body' error dump"""
+    text = data.decode("utf-8", errors="replace")
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    if text.startswith("Status: "):
+        status, _, rest = text.partition("\n")
+        body = rest.partition("\nBody: ")[2] if "\nBody: " in rest else rest.partition("Body: ")[2]
+        try:
+            body = json.loads(body)
+        except ValueError:
+            pass
+        # Response headers are all volatile (Date, nonces, cookies)
+        return {"status": status[len("Status: "):].strip(), "body": body}
+    return text
+
+
+def is_volatile(key: str) -> bool:
+    return key in VOLATILE_KEYS or key.endswith(VOLATILE_SUFFIXES)
+
+
+def normalise(value: Any) -> Any:
+    """Replace volatile values with placeholders so they compare equal across runs"""
+    if isinstance(value, dict):
+        return {key: "<volatile>" if is_volatile(key) else normalise(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [normalise(item) for item in value]
+    if isinstance(value, str):
+        if DATE_RE.match(value):
+            return "<date>"
+        return HOST_RE.sub("<host>", value)
+    return value
+
+
+def _type_name(value: Any) -> str:
+    return "null" if value is None else type(value).__name__
+
+
+def structural_diff(old: Any, new: Any, path: str = "", values: bool = False) -> List[Change]:
+    """Differences between two normalised payloads"""
+    if isinstance(old, dict) and isinstance(new, dict):
+        changes = []
+        for key in sorted(old.keys() - new.keys()):
+            changes.append(Change("removed", f"{path}.{key}"))
+        for key in sorted(new.keys() - old.keys()):
+            changes.append(Change("added", f"{path}.{key}", _type_name(new[key])))
+        for key in sorted(old.keys() & new.keys()):
+            changes.extend(structural_diff(old[key], new[key], f"{path}.{key}", values))
+        return changes
+    if isinstance(old, list) and isinstance(new, list):
+        changes = []
+        if len(old) != len(new):
+            changes.append(Change("length", path, f"{len(old)} -> {len(new)}"))
+        for i, (a, b) in enumerate(zip(old, new)):
+            changes.extend(structural_diff(a, b, f"{path}[{i}]", values))
+        return changes
+    if _type_name(old) != _type_name(new):
+        return [Change("type", path, f"{_type_name(old)} -> {_type_name(new)}")]
+    if values and old != new:
+        return [Change("value", path, f"{json.dumps(old)[:60]} -> {json.dumps(new)[:60]}")]
+    return []
+
+
+def diff_blobs(store: ArtifactStore, key: str, previous: Optional[str], current: str,
+               values: bool = False) -> Optional[SnapshotDiff]:
+    """Diff two blobs of one artifact; None when only volatile values differ"""
+    old_data = store.read_blob(previous)
+    new_data = store.read_blob(current)
+    if old_data is None or new_data is None:
+        return None
+    old = normalise(parse_snapshot(old_data))
+    new = normalise(parse_snapshot(new_data))
+    if old == new:
+        return None
+    changes = structural_diff(old, new, values=values)
+    if not changes:
+        # Same shape, different values: worth a line even when values are not listed
+        changes = [Change("value", "", "content changed")]
+    return SnapshotDiff(key, changes[:MAX_CHANGES], max(0, len(changes) - MAX_CHANGES))
+
+
+def diff_entries(store: ArtifactStore, entries: Dict[str, Dict[str, Any]], values: bool = False) -> List[SnapshotDiff]:
+    """Diff the given index entries against their previous blobs; new artifacts are skipped"""
+    diffs = []
+    for key, entry in sorted(entries.items()):
+        if not entry.get("previous") or entry["previous"] == entry["blob"]:
+            continue
+        diff = diff_blobs(store, key, entry["previous"], entry["blob"], values)
+        if diff is not None:
+            diffs.append(diff)
+    return diffs
+
+
+def diff_run(store: ArtifactStore, values: bool = False) -> List[SnapshotDiff]:
+    """Diffs for the artifacts this process changed; call before store.flush()"""
+    return diff_entries(store, store.changed(), values)
+
+
+def report(diffs: List[SnapshotDiff], limit: int = 30) -> List[str]:
+    if not diffs:
+        return []
+    endpoints = len({diff.endpoint for diff in diffs})
+    lines = [f"snapshot diff: {len(diffs)} responses changed across {endpoints} endpoints"]
+    shown = 0
+    for diff in diffs:
+        lines.append(f"  {diff.key}")
+        for change in diff.changes:
+            if shown >= limit:
+                break
+            lines.append(f"    {change.describe()}")
+            shown += 1
+        if diff.truncated:
+            lines.append(f"    ... {diff.truncated} more")
+        if shown >= limit:
+            lines.append("  (run python api-tests/snapshots.py for the full list)")
+            break
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Diff response artifacts against their previous version")
+    parser.add_argument("--values", action="store_true", help="report changed values as well as structure")
+    parser.add_argument("--json", action="store_true", help="print the diffs as JSON")
+    args = parser.parse_args()
+
+    store = ArtifactStore()
+    diffs = diff_entries(store, store.index, values=args.values)
+    if args.json:
+        print(json.dumps([diff.to_dict() for diff in diffs], indent=2))
+    else:
+        for line in report(diffs, limit=sys.maxsize) or ["No snapshot changes"]:
+            print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""
+Memory-bounded handling of large responses
+A response requested with stream=True is read in chunks: each chunk goes
+straight into the artifact store (the raw body, not re-serialised) and through
+an incremental JSON reader that yields the body's items one at a time. Peak
+memory is one chunk plus the largest single item, however big the collection
+(/wp/v2/posts?per_page=100&_embed, /wp/v2/block-types).
+
+    response = requests.get(url, auth=auth, timeout=10, stream=True)
+    body = save_response_stream("posts_outputs", "get_all_posts", response, check_item=check)
+    assert body.container == "list" and body.count == 100
+"""
+
+import codecs
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+
+import requests
+
+from artifacts import default_store, render_response, save_artifact
+
+STREAM_CHUNK_SIZE = 64 * 1024
+_NUMBER_CHARS = frozenset("0123456789.eE+-")
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
+
+
+class _Reader:
+    """Text of a chunked UTF-8 body, with only the unconsumed part buffered"""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self.eof = True
+            tail = self._text.decode(b"", final=True)
+        else:
+            tail = self._text.decode(chunk)
+        self.buffer = self.buffer[self.pos:] + tail
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """The next non-whitespace character, '' at the end of the body"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def take(self, expected: str) -> str:
+        char = self.peek()
+        if not char or char not in expected:
+            raise ValueError(f"Expected one of {expected!r} in the JSON body, got {char or 'end of body'!r}")
+        self.pos += 1
+        return char
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A value ending the buffer, or a number stopped at "2." or "2e", may go on in the next chunk
+            if (end == len(self.buffer) or isinstance(value, (int, float))
+                    and self.buffer[end] in _NUMBER_CHARS) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json_items(chunks: Iterable[bytes]) -> Iterator[Tuple[str, Any]]:
+    """Decode a JSON body one item at a time
+
+    Yields ("list", element) for each element of a top-level array,
+    ("dict", (key, value)) for each member of a top-level object and
+    ("value", value) once for any other body. Raises ValueError on invalid JSON.
+    """
+    reader = _Reader(chunks)
+    opening = reader.peek()
+    if opening not in ("[", "{"):
+        yield "value", reader.value()
+    else:
+        reader.take(opening)
+        container, closing = ("list", "]") if opening == "[" else ("dict", "}")
+        if reader.peek() == closing:
+            reader.take(closing)
+        else:
+            while True:
+                if container == "dict":
+                    key = reader.value()
+                    if not isinstance(key, str):
+                        raise ValueError(f"Object keys must be strings, got {key!r}")
+                    reader.take(":")
+                    yield container, (key, reader.value())
+                else:
+                    yield container, reader.value()
+                if reader.take("," + closing) == closing:
+                    break
+    if reader.peek():
+        raise ValueError("Extra data after the JSON body")
+
+
+@dataclass
+class StreamedBody:
+    """What save_response_stream() saw of a body it did not keep"""
+    key: str
+    container: str = ""   # list, dict or value; empty for non-2xx responses
+    count: int = 0        # array elements or object members
+    size: int = 0         # bytes saved
+
+
+def _tee(chunks: Iterable[bytes], write: Callable[[bytes], None]) -> Iterator[bytes]:
+    for chunk in chunks:
+        write(chunk)
+        yield chunk
+
+
+def save_response_stream(directory: str, name: str, response,
+                         check_item: Optional[Callable[[Any], None]] = None,
+                         chunk_size: int = STREAM_CHUNK_SIZE) -> StreamedBody:
+    """Save a response's raw body under <directory>/<name>.json while decoding it item by item
+
+    Meant for responses requested with stream=True; the body is never held in
+    memory whole. check_item is called with each element of a top-level array
+    as soon as it is decoded. The artifact is saved complete even when a check
+    or the decoding fails, and the error is then re-raised; a body cut short by
+    the connection is not saved. Non-2xx responses are small and saved in the
+    usual status dump format.
+    """
+    key = f"{directory}/{name}.json"
+    if not 200 <= response.status_code < 300:
+        save_artifact(directory, f"{name}.json", render_response(response))
+        return StreamedBody(key)
+
+    store = default_store()
+    body = StreamedBody(key)
+    chunks = response.iter_content(chunk_size)
+    with store.open_blob() as blob:
+        try:
+            for body.container, item in iter_json_items(_tee(chunks, blob.write)):
+                body.count += body.container != "value"
+                if check_item is not None and body.container == "list":
+                    check_item(item)
+        except requests.exceptions.RequestException:
+            raise
+        except Exception:
+            # Decoding or a check stopped early: keep the rest so the artifact is complete
+            for chunk in chunks:
+                blob.write(chunk)
+            store.link(key, blob.commit(), blob.size)
+            raise
+        store.link(key, blob.commit(), blob.size)
+    body.size = blob.size
+    return body
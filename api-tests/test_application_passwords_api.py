@@ -1,30 +1,26 @@
 import pytest
 import requests
 from requests.auth import HTTPBasicAuth
-import json
 from pathlib import Path
-import uuid
 import time
 
+from artifacts import save_artifact
+
 BASE_URL = "http://localhost:8000/wp-json"
 USERNAME = "maryamfatima"
 APP_PASSWORD = "I1KhCgDNwKwjYyo9SLqGbdm2"
 USER_ID = 1   # Change if needed
 
 SCREENSHOT_DIR = Path("api-tests/screenshots/test_run_outputs")
-SCREENSHOT_DIR.mkdir(parents=True, exist_ok=True)
 
 
 def save_response(name, response):
-    """Save every test API response as a JSON file for screenshot/report."""
-    output = SCREENSHOT_DIR / f"{name}.json"
-    with open(output, "w", encoding="utf-8") as f:
-        json.dump({
-            "status": response.status_code,
-            "url": response.url,
-            "body": safe_json(response)
-        }, f, indent=2)
-    return output
+    """Save every test API response to the artifact store for screenshot/report."""
+    return save_artifact(SCREENSHOT_DIR.name, f"{name}.json", {
+        "status": response.status_code,
+        "url": response.url,
+        "body": safe_json(response)
+    }, indent=2)
 
 
 def safe_json(response):
@@ -46,103 +42,130 @@ def api(method, endpoint, **kwargs):
     return response
 
 
+def passwords_path(user_id, uuid=None):
+    path = f"/wp/v2/users/{user_id}/application-passwords"
+    return f"{path}/{uuid}" if uuid else path
+
+
+# ------------------------------------------------------
+# -------------------   FIXTURES   ---------------------
+# ------------------------------------------------------
+# Write tests work on a throwaway user, so they can run in any order and on
+# parallel workers, and deleting "all" passwords never revokes the suite's own.
+
+@pytest.fixture
+def user(wp_resources):
+    """A uniquely named user, deleted after the test"""
+    try:
+        return wp_resources.user()
+    except requests.exceptions.ConnectionError:
+        pytest.skip("WordPress server is not running or not accessible")
+
+
+@pytest.fixture
+def app_password(wp_resources, user):
+    """An application password of the throwaway user"""
+    return wp_resources.application_password(user["id"])
+
+
 # ------------------------------------------------------
 # -------------------   TEST CASES   -------------------
 # ------------------------------------------------------
 
-def test_01_list_application_passwords():
+def test_list_application_passwords(user, app_password):
     """GET all application passwords"""
-    response = api("GET", f"/wp/v2/users/{USER_ID}/application-passwords")
-    save_response("01_list_passwords", response)
+    response = api("GET", passwords_path(user["id"]))
+    save_response("list_passwords", response)
 
-    assert response.status_code in (200, 404)
-    assert isinstance(safe_json(response), (dict, list))
+    assert response.status_code == 200
+    assert app_password["uuid"] in [item["uuid"] for item in response.json()]
 
 
-def test_02_create_application_password():
+def test_create_application_password(wp_resources, user):
     """POST → create new password"""
     payload = {
-        "name": f"TestKey-{uuid.uuid4()}",
+        "name": wp_resources.name("app-password"),
     }
 
-    response = api("POST", f"/wp/v2/users/{USER_ID}/application-passwords", json=payload)
-    save_response("02_create_password", response)
+    response = api("POST", passwords_path(user["id"]), json=payload)
+    save_response("create_password", response)
 
     assert response.status_code == 201
     assert "uuid" in response.json()
-
-    global CREATED_UUID
-    CREATED_UUID = response.json()["uuid"]
+    wp_resources.track(passwords_path(user["id"], response.json()["uuid"]))
 
 
-def test_03_get_single_password():
+def test_get_single_password(user, app_password):
     """GET specific password by uuid"""
-    response = api("GET", f"/wp/v2/users/{USER_ID}/application-passwords/{CREATED_UUID}")
-    save_response("03_get_single_password", response)
+    response = api("GET", passwords_path(user["id"], app_password["uuid"]))
+    save_response("get_single_password", response)
 
     assert response.status_code == 200
-    assert response.json().get("uuid") == CREATED_UUID
+    assert response.json().get("uuid") == app_password["uuid"]
 
 
-def test_04_update_application_password():
+def test_update_application_password(wp_resources, user, app_password):
     """PUT → update the name"""
-    payload = {"name": "Updated-Test-Password"}
+    payload = {"name": wp_resources.name("updated-app-password")}
 
-    response = api("PUT", f"/wp/v2/users/{USER_ID}/application-passwords/{CREATED_UUID}",
-                   json=payload)
-    save_response("04_update_password", response)
+    response = api("PUT", passwords_path(user["id"], app_password["uuid"]), json=payload)
+    save_response("update_password", response)
 
     assert response.status_code == 200
-    assert response.json()["name"] == "Updated-Test-Password"
+    assert response.json()["name"] == payload["name"]
 
 
-def test_05_introspect_password():
+def test_introspect_password():
     """GET /introspect endpoint → check currently used application password"""
-    response = api("GET", f"/wp/v2/users/{USER_ID}/application-passwords/introspect")
-    save_response("05_introspect", response)
+    response = api("GET", passwords_path(USER_ID, "introspect"))
+    save_response("introspect", response)
 
     assert response.status_code in (200, 404)
 
 
-def test_06_delete_single_password():
+def test_delete_single_password(wp_resources, user, app_password):
     """DELETE specific password"""
-    response = api("DELETE", f"/wp/v2/users/{USER_ID}/application-passwords/{CREATED_UUID}")
-    save_response("06_delete_single", response)
+    path = passwords_path(user["id"], app_password["uuid"])
+    response = api("DELETE", path)
+    save_response("delete_single", response)
 
     assert response.status_code == 200
+    wp_resources.forget(path)
 
 
-def test_07_delete_all_passwords():
+def test_delete_all_passwords(wp_resources, wp_batch, user):
     """DELETE all passwords"""
-    response = api("DELETE", f"/wp/v2/users/{USER_ID}/application-passwords")
-    save_response("07_delete_all", response)
+    wp_resources.application_passwords(user["id"], 2, batch=wp_batch)
+
+    response = api("DELETE", passwords_path(user["id"]))
+    save_response("delete_all", response)
 
     assert response.status_code in (200, 204)
+    assert api("GET", passwords_path(user["id"])).json() == []
 
 
-def test_08_invalid_uuid():
+def test_invalid_uuid():
     """Accessing invalid uuid must return 404"""
     fake = "00000000-0000-0000-0000-000000000000"
 
-    response = api("GET", f"/wp/v2/users/{USER_ID}/application-passwords/{fake}")
-    save_response("08_invalid_uuid", response)
+    response = api("GET", passwords_path(USER_ID, fake))
+    save_response("invalid_uuid", response)
 
     assert response.status_code == 404
 
 
-def test_09_missing_name_field_on_create():
+def test_missing_name_field_on_create():
     """POST with missing required name must fail"""
-    response = api("POST", f"/wp/v2/users/{USER_ID}/application-passwords",
-                   json={})
-    save_response("09_missing_name", response)
+    response = api("POST", passwords_path(USER_ID), json={})
+    save_response("missing_name", response)
 
     assert response.status_code == 400
 
 
-def test_10_unauthenticated_access():
+def test_unauthenticated_access():
     """No credentials should return 401"""
-    url = f"{BASE_URL}/wp/v2/users/{USER_ID}/application-passwords"
+    url = f"{BASE_URL}{passwords_path(USER_ID)}"
     response = requests.get(url)  # no auth
-    save_response("10_unauthenticated", response)
+    save_response("unauthenticated", response)
 
     assert response.status_code in (401, 403)
@@ -1,24 +1,23 @@
 import pytest
 import requests
 from requests.auth import HTTPBasicAuth
-import json
 from pathlib import Path
 
+from artifacts import save_artifact
+
 BASE_URL = "http://localhost:8000/wp-json"
 USERNAME = "maryamfatima"
 APP_PASSWORD = "7BXacgwVlWHXWNzwpL7ZtzGS"
 
 SCREENSHOT_DIR = Path("api-tests/screenshots/test_categories_outputs")
-SCREENSHOT_DIR.mkdir(parents=True, exist_ok=True)
 
 def save_response_screenshot(name, response):
-    filepath = SCREENSHOT_DIR / f"{name}.json"
     try:
-        json.dump(response.json(), open(filepath, "w", encoding="utf-8"), indent=4)
+        content = response.json()
     except Exception:
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(response.text)
-    print(f"Saved response screenshot: {filepath}")
+        content = response.text
+    key = save_artifact(SCREENSHOT_DIR.name, f"{name}.json", content)
+    print(f"Saved response screenshot: {key}")
 
 # ----------------- Tests -----------------
 
@@ -0,0 +1,135 @@
+"""
+Route parser tests: small register_rest_route() snippets run through
+PHPControllerParser and checked against the Route / RouteEndpoint records.
+No WordPress server needed.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from test_generator import PHPControllerParser, Route, RouteEndpoint
+
+pytestmark = pytest.mark.offline
+
+
+def parse_routes(body, namespace="wp/v2", rest_base="things"):
+    """Routes registered by a register_routes() body"""
+    content = f"""<?php
+class Things_Controller extends WP_REST_Controller {{
+    public function register_routes() {{
+{body}
+    }}
+}}
+"""
+    return PHPControllerParser(Path("."))._extract_routes_detailed(content, namespace, rest_base)
+
+
+def test_methods_constants():
+    routes = parse_routes("""
+        register_rest_route( $this->namespace, '/' . $this->rest_base, array(
+            array(
+                'methods'             => WP_REST_Server::READABLE,
+                'callback'            => array( $this, 'get_items' ),
+                'permission_callback' => array( $this, 'get_items_permissions_check' ),
+                'args'                => $this->get_collection_params(),
+            ),
+            array(
+                'methods'  => WP_REST_Server::CREATABLE,
+                'callback' => array( $this, 'create_item' ),
+            ),
+            'schema' => array( $this, 'get_public_item_schema' ),
+        ) );
+    """)
+
+    assert routes == [Route(path="things", namespace="wp/v2", endpoints=(
+        RouteEndpoint(methods=("GET",), callback="get_items", permission_callback="get_items_permissions_check",
+                      args_source="$this->get_collection_params()"),
+        RouteEndpoint(methods=("POST",), callback="create_item"),
+    ))]
+    assert routes[0].methods == ("GET", "HEAD", "POST")
+
+
+def test_editable_as_string_and_list():
+    routes = parse_routes("""
+        register_rest_route( 'my/v1', '/a', array(
+            'methods'  => 'POST, PUT, PATCH',
+            'callback' => 'update_a',
+        ) );
+        register_rest_route( 'my/v1', '/b', array(
+            'methods'  => array( WP_REST_Server::EDITABLE, 'DELETE' ),
+            'callback' => 'edit_b',
+        ) );
+        register_rest_route( 'my/v1', '/c', [ [ 'methods' => [ 'GET', 'POST' ], 'callback' => 'c' ] ] );
+    """)
+
+    assert [(route.path, route.namespace) for route in routes] == [("a", "my/v1"), ("b", "my/v1"), ("c", "my/v1")]
+    assert routes[0].endpoints[0].methods == ("POST", "PUT", "PATCH")
+    assert routes[1].endpoints[0].methods == ("POST", "PUT", "PATCH", "DELETE")
+    assert routes[2].endpoints[0].methods == ("GET", "POST")
+
+
+def test_handler_without_methods_defaults_to_get():
+    routes = parse_routes("""
+        register_rest_route( 'my/v1', '/x', array(
+            'callback'            => array( $this, 'get_x' ),
+            'permission_callback' => '__return_true',
+        ) );
+        register_rest_route( 'my/v1', '/y', [
+            [ 'callback' => 'list_y' ],
+            [ 'methods' => 'POST', 'callback' => function ( $request ) { return $request; } ],
+        ] );
+    """)
+
+    assert routes[0].endpoints == (
+        RouteEndpoint(methods=("GET",), callback="get_x", permission_callback="__return_true"),
+    )
+    assert routes[0].methods == ("GET", "HEAD")
+    assert routes[1].endpoints == (
+        RouteEndpoint(methods=("GET",), callback="list_y"),
+        RouteEndpoint(methods=("POST",), callback="closure"),
+    )
+
+
+def test_nested_args():
+    routes = parse_routes(r"""
+        register_rest_route( $this->namespace, '/' . $this->rest_base . '/(?P<id>[\d]+)', array(
+            'args' => array(
+                'id' => array(
+                    'description' => __( 'Unique identifier for the thing.' ),
+                    'type'        => 'integer',
+                ),
+            ),
+            array(
+                'methods'  => WP_REST_Server::EDITABLE,
+                'callback' => array( $this, 'update_item' ),
+                'args'     => array(
+                    'title' => array( 'type' => 'string', 'required' => true ),
+                    'tags'  => array(
+                        'type'  => array( 'array', 'null' ),
+                        'items' => array( 'type' => 'integer' ),
+                    ),
+                ),
+            ),
+        ) );
+    """)
+
+    route = routes[0]
+    assert route.path == r"things/(?P<id>[\d]+)"
+    assert route.params == (("id", "integer"),)
+    assert route.endpoints[0].args == {
+        "title": {"type": "string", "required": True},
+        "tags": {"type": ["array", "null"], "items": {"type": "integer"}},
+    }
+    assert route.endpoints[0].args_source == ""
+
+
+def test_options_only_route():
+    routes = parse_routes("""
+        register_rest_route( 'my/v1', '/ping', [ 'methods' => 'OPTIONS', 'callback' => fn() => null ] );
+    """)
+
+    assert routes == [Route(path="ping", namespace="my/v1", endpoints=(
+        RouteEndpoint(methods=("OPTIONS",), callback="closure"),
+    ))]
+    assert routes[0].methods == ("OPTIONS",)
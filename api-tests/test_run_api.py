@@ -4,22 +4,22 @@ from requests.auth import HTTPBasicAuth
 import json
 from pathlib import Path
 
+from artifacts import save_artifact
+
 BASE_URL = "http://localhost:8000/wp-json"
 USERNAME = "maryamfatima"
 APP_PASSWORD = "I1KhCgDNwKwjYyo9SLqGbdm2"
 
 SCREENSHOT_DIR = Path("api-tests/screenshots/test_run_outputs")
-SCREENSHOT_DIR.mkdir(parents=True, exist_ok=True)
 
 def save_response_screenshot(name, response):
-    """Save API response to a JSON file for debugging"""
-    filepath = SCREENSHOT_DIR / f"{name}.json"
+    """Save API response to the artifact store for debugging"""
     try:
-        json.dump(response.json(), open(filepath, "w", encoding="utf-8"), indent=4)
+        content = response.json()
     except Exception:
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(response.text)
-    print(f"Saved response screenshot: {filepath}")
+        content = response.text
+    key = save_artifact(SCREENSHOT_DIR.name, f"{name}.json", content)
+    print(f"Saved response screenshot: {key}")
 
 
 def get_ability_by_annotation(readonly=None, destructive=None, idempotent=None):
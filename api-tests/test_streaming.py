@@ -0,0 +1,115 @@
+"""
+Incremental JSON reader tests: bodies fed to iter_json_items() and
+save_response_stream() in hand-cut chunks, checking the decoded items and
+the exact bytes teed into the artifact store. No WordPress server needed.
+"""
+
+import json
+
+import pytest
+
+import streaming
+from artifacts import ArtifactStore
+from streaming import iter_json_items, save_response_stream
+
+pytestmark = pytest.mark.offline
+
+
+class ChunkedResponse:
+    """Just enough of requests.Response for save_response_stream()"""
+
+    def __init__(self, chunks, status_code=200):
+        self.chunks = chunks
+        self.status_code = status_code
+
+    def iter_content(self, chunk_size):
+        return iter(self.chunks)
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = ArtifactStore(tmp_path)
+    monkeypatch.setattr(streaming, "default_store", lambda: store)
+    return store
+
+
+def test_items_ending_on_chunk_boundaries():
+    chunks = [b'[{"id": 1}', b',', b'{"id": 2}', b', 3', b']']
+    assert list(iter_json_items(chunks)) == [("list", {"id": 1}), ("list", {"id": 2}), ("list", 3)]
+
+
+def test_numbers_split_across_chunks():
+    # "12" + "3" and "4." + "5e1" are single numbers, not two values each
+    assert list(iter_json_items([b"[12", b"3, 4.", b"5e1", b"]"])) == [("list", 123), ("list", 45.0)]
+
+
+def test_multibyte_utf8_split_across_chunks():
+    body = json.dumps([{"title": "café €"}], ensure_ascii=False).encode("utf-8")
+    euro = body.index("€".encode("utf-8"))
+    chunks = [body[:euro + 1], body[euro + 1:euro + 2], body[euro + 2:]]
+    assert list(iter_json_items(chunks)) == [("list", {"title": "café €"})]
+
+
+def test_whitespace_only_chunks():
+    chunks = [b"  ", b"\n[", b" ", b'"x"', b"\t", b"  ]", b"\r\n"]
+    assert list(iter_json_items(chunks)) == [("list", "x")]
+
+
+def test_object_body():
+    chunks = [b'{"name": "Site", ', b'"namespaces": ["wp/v2"', b'], "authentication": {}}']
+    assert list(iter_json_items(chunks)) == [
+        ("dict", ("name", "Site")),
+        ("dict", ("namespaces", ["wp/v2"])),
+        ("dict", ("authentication", {})),
+    ]
+
+
+def test_scalar_and_empty_bodies():
+    assert list(iter_json_items([b"4", b"2"])) == [("value", 42)]
+    assert list(iter_json_items([b"[", b"]"])) == []
+    assert list(iter_json_items([b"{ }"])) == []
+
+
+@pytest.mark.parametrize("chunks", [
+    [b'[1, {"id": ', b"2"],
+    [b"[1, 2"],
+    [b""],
+    [b"[1] x"],
+])
+def test_truncated_or_invalid_input(chunks):
+    with pytest.raises(ValueError):
+        list(iter_json_items(chunks))
+
+
+def test_save_response_stream_tees_exact_bytes(store):
+    chunks = [b'[ {"id": 1},', b'\n', b'{"id": 2, "t": "\xe2\x82', b'\xac"} ]']
+    checked = []
+
+    body = save_response_stream("posts_outputs", "list", ChunkedResponse(chunks), check_item=checked.append)
+
+    assert (body.key, body.container, body.count, body.size) == (
+        "posts_outputs/list.json", "list", 2, len(b"".join(chunks)))
+    assert checked == [{"id": 1}, {"id": 2, "t": "€"}]
+    assert store.get("posts_outputs/list.json") == b"".join(chunks)
+
+
+def test_save_response_stream_keeps_the_whole_body_when_a_check_fails(store):
+    chunks = [b"[1,", b" 2,", b" 3]"]
+
+    def check(item):
+        if item == 1:
+            raise AssertionError("bad item")
+
+    with pytest.raises(AssertionError):
+        save_response_stream("posts_outputs", "checked", ChunkedResponse(chunks), check_item=check)
+
+    assert store.get("posts_outputs/checked.json") == b"[1, 2, 3]"
+
+
+def test_save_response_stream_saves_truncated_bodies_as_received(store):
+    chunks = [b'[{"id": 1}, ', b'{"id"']
+
+    with pytest.raises(ValueError):
+        save_response_stream("posts_outputs", "cut", ChunkedResponse(chunks))
+
+    assert store.get("posts_outputs/cut.json") == b'[{"id": 1}, {"id"'
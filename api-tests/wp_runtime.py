@@ -0,0 +1,774 @@
+"""
+Shared HTTP runtime for the API test suites
+Every requests.get/post/... call made by the generated and hand-written suites
+is routed through one session, whose adapter applies the policies below
+"""
+
+import io
+import ipaddress
+import os
+import random
+import re
+import threading
+import time
+from http.cookiejar import DefaultCookiePolicy
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+import requests.api
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPConnectionPool, HTTPSConnectionPool, PoolManager
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.exceptions import NewConnectionError
+from urllib3.util import make_headers
+
+try:
+    import orjson
+except ImportError:  # optional: the standard library decoder is used instead
+    orjson = None
+
+from config import (
+    BREAKER_COOLDOWN,
+    BREAKER_THRESHOLD,
+    CONNECT_TIMEOUT,
+    MAX_CONCURRENCY,
+    MAX_REQUESTS_PER_SECOND,
+    READ_TIMEOUT,
+    RETRY_ATTEMPTS,
+    RETRY_BACKOFF,
+    RETRY_BACKOFF_MAX,
+)
+from http_cache import CacheWriter, HTTPCache
+
+# Statuses that mean "slow down"
+THROTTLE_STATUSES = (429, 503)
+# Smoothed latency above this multiple of the best seen counts as overload
+LATENCY_TOLERANCE = 2.0
+LATENCY_SMOOTHING = 0.2
+BACKOFF_FACTOR = 0.5
+MIN_REQUESTS_PER_SECOND = 1.0
+# Safe to send twice: the server ends up in the same state
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+RETRY_STATUSES = (429, 502, 503, 504)
+# Getting a connection from the pool slower than this counts as a wait
+POOL_WAIT_THRESHOLD = 0.001
+
+
+class ServerUnavailable(requests.exceptions.ConnectionError):
+    """Raised without touching the network while the circuit breaker is open
+
+    It is a ConnectionError, so suites that skip on an unreachable server
+    keep doing so, just without waiting for a timeout every time.
+    """
+
+
+class Governor:
+    """Token bucket plus an adaptive (AIMD) concurrency limit
+
+    Throughput grows additively while the server keeps up and is cut
+    multiplicatively on 429/503 responses or when latency climbs. Latency is
+    judged per route (route_key), against that route's own best, so a slow
+    _embed collection is not mistaken for an overloaded server.
+    """
+
+    def __init__(self, rate: float, max_concurrency: int):
+        self.max_rate = max(rate, MIN_REQUESTS_PER_SECOND)
+        self.rate = self.max_rate
+        self.tokens = self.rate
+        self.max_concurrency = max(1, max_concurrency)
+        self.limit = float(self.max_concurrency)
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.last_refill = time.monotonic()
+        self.last_backoff = 0.0
+        # Smoothed latency over all routes, which paces back-offs
+        self.latency: Optional[float] = None
+        # Per route key: [smoothed latency, best smoothed latency]
+        self.route_latency: Dict[str, List[float]] = {}
+        self.requests = 0
+        self.throttled = 0
+        self.backoffs = 0
+        self.waited = 0.0
+        self._cond = threading.Condition()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.rate, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def acquire(self) -> None:
+        """Block until a token and a concurrency slot are available"""
+        start = time.monotonic()
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.paused_until:
+                    timeout = self.paused_until - now
+                elif self.in_flight >= int(self.limit):
+                    timeout = None
+                elif self.tokens < 1:
+                    timeout = (1 - self.tokens) / self.rate
+                else:
+                    self.tokens -= 1
+                    self.in_flight += 1
+                    self.requests += 1
+                    self.waited += now - start
+                    return
+                self._cond.wait(timeout)
+
+    def release(self, status: Optional[int] = None, latency: Optional[float] = None,
+                retry_after: Optional[str] = None, route: str = "") -> None:
+        """Return the slot and adapt to how the server answered"""
+        with self._cond:
+            self.in_flight -= 1
+            if status in THROTTLE_STATUSES:
+                self.throttled += 1
+                self._back_off(retry_after)
+            elif latency is not None:
+                self._observe_latency(latency, route)
+            self._cond.notify_all()
+
+    def _observe_latency(self, latency: float, route: str = "") -> None:
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += LATENCY_SMOOTHING * (latency - self.latency)
+        stats = self.route_latency.get(route)
+        if stats is None:
+            stats = self.route_latency[route] = [latency, latency]
+        else:
+            stats[0] += LATENCY_SMOOTHING * (latency - stats[0])
+            stats[1] = min(stats[1], stats[0])
+
+        if stats[0] > stats[1] * LATENCY_TOLERANCE:
+            self._back_off()
+        else:
+            # Additive increase: about one extra slot / request per second per window
+            self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+            self.rate = min(self.max_rate, self.rate + 1 / self.rate)
+
+    def _back_off(self, retry_after: Optional[str] = None) -> None:
+        now = time.monotonic()
+        if retry_after:
+            try:
+                self.paused_until = max(self.paused_until, now + float(retry_after))
+            except ValueError:
+                pass
+        # One cut per smoothed round trip, otherwise a burst of slow replies collapses the limit
+        if now - self.last_backoff < (self.latency or 0.0):
+            return
+        self.last_backoff = now
+        self.backoffs += 1
+        self.limit = max(1.0, self.limit * BACKOFF_FACTOR)
+        self.rate = max(MIN_REQUESTS_PER_SECOND, self.rate * BACKOFF_FACTOR)
+        # Let the latency baselines re-learn once the server has had room to recover
+        for stats in self.route_latency.values():
+            stats[1] *= 1 + BACKOFF_FACTOR
+
+    def summary(self) -> str:
+        return (f"{self.requests} requests, {self.throttled} throttled responses, "
+                f"{self.backoffs} back-offs, {self.waited:.1f}s queued, "
+                f"ended at {self.rate:.1f} req/s x {int(self.limit)} concurrent")
+
+
+UUID_SEGMENT = re.compile(r"/[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}(?=/|$)", re.I)
+NUMERIC_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def route_key(method: str, url: str) -> str:
+    """Method plus REST route with ids folded, e.g. "GET /wp/v2/posts/{id}" """
+    path = urlsplit(url).path
+    if "/wp-json" in path:
+        path = path.split("/wp-json", 1)[1] or "/"
+    path = UUID_SEGMENT.sub("/{uuid}", path)
+    path = NUMERIC_SEGMENT.sub("/{id}", path)
+    return f"{method.upper()} {path}"
+
+
+class TransferStats:
+    """Bytes on the wire against decoded body bytes, per route"""
+
+    def __init__(self):
+        self.routes: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _route(self, key: str) -> Dict[str, Any]:
+        return self.routes.setdefault(key, {"requests": 0, "wire": 0, "body": 0, "encodings": []})
+
+    def record(self, key: str, wire_bytes: int, body_bytes: int, encoding: str) -> None:
+        with self._lock:
+            route = self._route(key)
+            route["requests"] += 1
+            route["wire"] += wire_bytes
+            route["body"] += body_bytes
+            if encoding not in route["encodings"]:
+                route["encodings"].append(encoding)
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {key: dict(route, encodings=list(route["encodings"])) for key, route in self.routes.items()}
+
+    def merge(self, routes: Dict[str, Dict[str, Any]]) -> None:
+        """Add counts collected elsewhere (a pytest-xdist worker)"""
+        with self._lock:
+            for key, other in routes.items():
+                route = self._route(key)
+                for name in ("requests", "wire", "body"):
+                    route[name] += other[name]
+                route["encodings"].extend(e for e in other["encodings"] if e not in route["encodings"])
+
+    def report(self, limit: int = 15) -> List[str]:
+        """Totals plus the routes that cost the most on the wire"""
+        routes = self.to_dict()
+        if not routes:
+            return []
+        wire = sum(r["wire"] for r in routes.values())
+        body = sum(r["body"] for r in routes.values())
+        requests_made = sum(r["requests"] for r in routes.values())
+        lines = [f"transfer: {format_bytes(wire)} on the wire for {format_bytes(body)} of response bodies "
+                 f"({format_ratio(wire, body)}) in {requests_made} requests"]
+        for key, r in sorted(routes.items(), key=lambda kv: -kv[1]["wire"])[:limit]:
+            lines.append(f"  {format_bytes(r['wire']):>9} wire {format_bytes(r['body']):>9} body "
+                         f"{format_ratio(r['wire'], r['body']):>5} {r['requests']:>5} req  "
+                         f"{'/'.join(r['encodings']):<14} {key}")
+        return lines
+
+
+def format_bytes(n: float) -> str:
+    if n < 1024:
+        return f"{n:.0f}B"
+    for unit in ("KB", "MB", "GB"):
+        n /= 1024
+        if n < 1024 or unit == "GB":
+            return f"{n:.1f}{unit}"
+
+
+def format_ratio(wire: int, body: int) -> str:
+    return f"{wire / body:.0%}" if body else "-"
+
+
+class ConnectionStats:
+    """Connection churn per pool (one pool per scheme, host and port)
+
+    Counts requests against connections opened and reused, connects that
+    failed, times the pool had no idle connection (exhausted) or was too full
+    to take one back (discarded), slow pool checkouts (waits), DNS lookups
+    and TLS handshakes, with the time spent connecting, handshaking and waiting.
+    """
+
+    COUNTERS = ("requests", "opened", "reused", "failed", "exhausted", "discarded", "waits", "dns", "tls")
+    TIMERS = ("connect_s", "tls_s", "wait_s")
+
+    def __init__(self):
+        self.pools: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _pool(self, key: str) -> Dict[str, Any]:
+        pool = self.pools.get(key)
+        if pool is None:
+            pool = self.pools[key] = dict.fromkeys(self.COUNTERS, 0)
+            pool.update(dict.fromkeys(self.TIMERS, 0.0), maxsize=0)
+        return pool
+
+    def count(self, key: str, **increments) -> None:
+        with self._lock:
+            pool = self._pool(key)
+            for name, value in increments.items():
+                pool[name] += value
+
+    def register(self, key: str, maxsize: int) -> None:
+        with self._lock:
+            pool = self._pool(key)
+            pool["maxsize"] = max(pool["maxsize"], maxsize)
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {key: dict(pool) for key, pool in self.pools.items()}
+
+    def merge(self, pools: Dict[str, Dict[str, Any]]) -> None:
+        """Add counts collected elsewhere (a pytest-xdist worker)"""
+        with self._lock:
+            for key, other in pools.items():
+                pool = self._pool(key)
+                for name in self.COUNTERS + self.TIMERS:
+                    pool[name] += other.get(name, 0)
+                pool["maxsize"] = max(pool["maxsize"], other.get("maxsize", 0))
+
+    def report(self) -> List[str]:
+        pools = self.to_dict()
+        if not pools:
+            return []
+        total = {name: sum(pool[name] for pool in pools.values()) for name in self.COUNTERS}
+        lines = [f"connections: {total['requests']} requests on {total['opened']} connections opened "
+                 f"({format_share(total['reused'], total['requests'])} reused), {total['dns']} DNS lookups, "
+                 f"{total['tls']} TLS handshakes, {total['failed']} failed connects"]
+        for key, pool in sorted(pools.items(), key=lambda kv: -kv[1]["requests"]):
+            lines.append(
+                f"  {key} (pool of {pool['maxsize']}): {pool['requests']} req, {pool['opened']} opened "
+                f"(connect {format_average(pool['connect_s'], pool['opened'] + pool['failed'])}), "
+                f"{pool['reused']} reused, {pool['dns']} dns, "
+                f"{pool['tls']} tls ({format_average(pool['tls_s'], pool['tls'])}), "
+                f"{pool['exhausted']} exhausted, {pool['discarded']} discarded, "
+                f"{pool['waits']} waits ({pool['wait_s']:.2f}s)"
+            )
+        return lines
+
+
+def format_share(part: int, whole: int) -> str:
+    return f"{part / whole:.0%}" if whole else "-"
+
+
+def format_average(seconds: float, count: int) -> str:
+    return f"{seconds / count * 1000:.1f}ms avg" if count else "-"
+
+
+def _is_ip(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host.strip("[]"))
+        return True
+    except ValueError:
+        return False
+
+
+class _MeteredConnection:
+    """Times connects and TLS handshakes into the owning pool's ConnectionStats"""
+
+    stats: Optional[ConnectionStats] = None
+    stats_key = ""
+
+    def _new_conn(self):
+        # The socket connect: DNS resolution (urllib3 does not cache it) plus the TCP handshake
+        start = time.perf_counter()
+        try:
+            sock = super()._new_conn()
+        except Exception:
+            if self.stats is not None:
+                self.stats.count(self.stats_key, failed=1, connect_s=time.perf_counter() - start,
+                                 dns=0 if _is_ip(self.host) else 1)
+            raise
+        self._connected_in = time.perf_counter() - start
+        if self.stats is not None:
+            self.stats.count(self.stats_key, opened=1, connect_s=self._connected_in,
+                             dns=0 if _is_ip(self.host) else 1)
+        return sock
+
+
+class MeteredHTTPConnection(_MeteredConnection, HTTPConnection):
+    pass
+
+
+class MeteredHTTPSConnection(_MeteredConnection, HTTPSConnection):
+    def connect(self):
+        start = time.perf_counter()
+        self._connected_in = 0.0
+        super().connect()
+        if self.stats is not None:
+            # Everything after the socket connect is the TLS handshake
+            self.stats.count(self.stats_key, tls=1, tls_s=time.perf_counter() - start - self._connected_in)
+
+
+class _MeteredPool:
+    """Counts pool checkouts, reuse, exhaustion and discards into a ConnectionStats"""
+
+    stats: Optional[ConnectionStats] = None
+    stats_key = ""
+
+    def _new_conn(self):
+        conn = super()._new_conn()
+        conn.stats, conn.stats_key = self.stats, self.stats_key
+        return conn
+
+    def _get_conn(self, timeout=None):
+        start = time.perf_counter()
+        # The queue starts out holding maxsize None placeholders, so empty means every connection is busy
+        exhausted = self.pool is not None and self.pool.empty()
+        conn = super()._get_conn(timeout)
+        waited = time.perf_counter() - start
+        if self.stats is not None:
+            self.stats.count(self.stats_key, requests=1, exhausted=int(exhausted),
+                             reused=int(getattr(conn, "sock", None) is not None),
+                             waits=int(waited > POOL_WAIT_THRESHOLD), wait_s=waited)
+        return conn
+
+    def _put_conn(self, conn):
+        if conn is not None and self.stats is not None and self.pool is not None and self.pool.full():
+            self.stats.count(self.stats_key, discarded=1)
+        super()._put_conn(conn)
+
+
+class MeteredHTTPConnectionPool(_MeteredPool, HTTPConnectionPool):
+    ConnectionCls = MeteredHTTPConnection
+
+
+class MeteredHTTPSConnectionPool(_MeteredPool, HTTPSConnectionPool):
+    ConnectionCls = MeteredHTTPSConnection
+
+
+class MeteredPoolManager(PoolManager):
+    """PoolManager whose pools report to one ConnectionStats"""
+
+    def __init__(self, *args, stats: ConnectionStats, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = stats
+        self.pool_classes_by_scheme = {"http": MeteredHTTPConnectionPool, "https": MeteredHTTPSConnectionPool}
+
+    def _new_pool(self, scheme, host, port, request_context=None):
+        pool = super()._new_pool(scheme, host, port, request_context)
+        pool.stats, pool.stats_key = self.stats, f"{scheme}://{host}:{port}"
+        self.stats.register(pool.stats_key, pool.pool.maxsize if pool.pool is not None else 0)
+        return pool
+
+
+_UNSET = object()
+
+
+class WPResponse(requests.Response):
+    """Response whose JSON body is decoded once and then reused
+
+    Assertions and save_response_screenshot() both call json(); the second
+    call returns the same object. orjson is used when installed.
+    """
+
+    _json = _UNSET
+    # StreamTap set by RuntimeAdapter on stream=True responses
+    _tap = None
+
+    def iter_content(self, chunk_size=1, decode_unicode=False):
+        tap, self._tap = self._tap, None
+        if tap is None:
+            return super().iter_content(chunk_size, decode_unicode)
+        chunks = tap.watch(self, super().iter_content(chunk_size))
+        return requests.utils.stream_decode_response_unicode(chunks, self) if decode_unicode else chunks
+
+    def json(self, **kwargs) -> Any:
+        if kwargs:
+            return super().json(**kwargs)
+        if self._json is _UNSET:
+            self._json = self._decode()
+        return self._json
+
+    def _decode(self) -> Any:
+        encoding = (self.encoding or "utf-8").lower().replace("_", "-")
+        if orjson is not None and encoding in ("utf-8", "utf8") and self.content:
+            try:
+                return orjson.loads(self.content)
+            except orjson.JSONDecodeError:
+                pass  # let requests raise its usual JSONDecodeError (and handle BOMs)
+        return super().json()
+
+
+class StreamTap:
+    """Accounting that a stream=True response can only get once its body has been read
+
+    Records the route's transfer and stores the body in the revalidation cache
+    as it passes, without holding it in memory. content, text and json() read
+    through iter_content(), so they are covered too.
+    """
+
+    def __init__(self, adapter: "RuntimeAdapter", request, wire_raw, writer: Optional[CacheWriter] = None):
+        self.adapter = adapter
+        self.key = route_key(request.method, request.url)
+        # For a 304 answered from the cache this is the 304's own (empty) body
+        self.wire_raw = wire_raw
+        self.writer = writer
+        self.body = 0
+
+    def watch(self, response, chunks):
+        completed = False
+        try:
+            for chunk in chunks:
+                self.body += len(chunk)
+                if self.writer is not None:
+                    self.writer.write(chunk)
+                yield chunk
+            completed = True
+        finally:
+            self.close(response, completed)
+
+    def close(self, response, completed: bool) -> None:
+        wire = self.wire_raw.tell() if hasattr(self.wire_raw, "tell") else self.body
+        encoding = response.headers.get("Content-Encoding", "identity")
+        # Like a non-streamed 304, a body served from the cache counts as nothing transferred
+        body = 0 if getattr(response, "from_cache", False) else self.body
+        self.adapter.transfer.record(self.key, wire, body, encoding)
+        if isinstance(response.raw, io.IOBase):
+            response.raw.close()
+        if self.writer is None:
+            return
+        if completed:
+            self.writer.commit()
+            self.adapter.cache.stats.count(self.key, "stored")
+        else:
+            self.writer.abort()
+
+
+class CircuitBreaker:
+    """Opens after consecutive connection failures, then lets one probe through per cooldown"""
+
+    def __init__(self, threshold: int = BREAKER_THRESHOLD, cooldown: float = BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trips = 0
+        self._lock = threading.Lock()
+
+    def is_open(self) -> bool:
+        with self._lock:
+            return self.opened_at is not None and time.monotonic() - self.opened_at < self.cooldown
+
+    def allow(self) -> bool:
+        """False while open; after the cooldown a single caller gets through (half-open)"""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.cooldown:
+                return False
+            # Restart the cooldown so only this probe goes out
+            self.opened_at = time.monotonic()
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                if self.opened_at is None:
+                    self.trips += 1
+                self.opened_at = time.monotonic()
+
+
+def split_timeout(timeout):
+    """Turn a single timeout into (connect, read) so an unreachable host fails fast"""
+    if timeout is None:
+        return (CONNECT_TIMEOUT, READ_TIMEOUT)
+    if isinstance(timeout, (int, float)):
+        return (min(CONNECT_TIMEOUT, timeout), timeout)
+    return timeout
+
+
+def retry_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """Full-jitter exponential backoff, never shorter than the server's Retry-After"""
+    delay = random.uniform(0, min(RETRY_BACKOFF_MAX, RETRY_BACKOFF * 2 ** attempt))
+    if retry_after:
+        try:
+            delay = max(delay, min(RETRY_BACKOFF_MAX, float(retry_after)))
+        except ValueError:
+            pass
+    return delay
+
+
+def _never_connected(error: Exception) -> bool:
+    """The request did not reach the server, so retrying is safe for any method"""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+class RuntimeAdapter(HTTPAdapter):
+    """HTTPAdapter that applies the governor, timeouts, retries and circuit breaker"""
+
+    def __init__(self, governor: Governor, breaker: Optional[CircuitBreaker] = None, **kwargs):
+        self.governor = governor
+        self.breaker = breaker or CircuitBreaker()
+        self.transfer = TransferStats()
+        self.connections = ConnectionStats()
+        self.cache: Optional[HTTPCache] = None
+        # cassettes.Cassette when running with --cassette=record/replay
+        self.cassette = None
+        self.retries = 0
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        if self.cassette is not None and self.cassette.mode == "replay":
+            return self.cassette.play(request, self)
+        kwargs["timeout"] = split_timeout(kwargs.get("timeout"))
+        idempotent = request.method.upper() in IDEMPOTENT_METHODS
+
+        # Revalidate GETs we have a validator for, unless the caller is doing it already
+        cache = self.cache
+        stream = kwargs.get("stream")
+        if (cache is None or request.method.upper() != "GET"
+                or "If-None-Match" in request.headers or "If-Modified-Since" in request.headers):
+            cache = None
+        entry = cache.lookup(request, load_body=not stream) if cache is not None else None
+        if entry is not None:
+            request = request.copy()
+            request.headers.update(cache.conditional_headers(entry))
+
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                raise ServerUnavailable(
+                    f"{request.url}: circuit open after {self.breaker.failures} connection failures",
+                    request=request,
+                )
+            try:
+                response = self._send_governed(request, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                self.breaker.record_failure()
+                if attempt >= RETRY_ATTEMPTS or not (idempotent or _never_connected(e)) or self.breaker.is_open():
+                    raise
+                time.sleep(retry_delay(attempt))
+            else:
+                self.breaker.record_success()
+                if attempt >= RETRY_ATTEMPTS or not idempotent or response.status_code not in RETRY_STATUSES:
+                    wire_raw = response.raw
+                    if not stream:
+                        self._record_transfer(request, response)
+                    writer = self._revalidate(cache, entry, request, response, stream) if cache is not None else None
+                    if stream:
+                        # Transfer and cache storage happen as the caller reads the body
+                        response._tap = StreamTap(self, request, wire_raw, writer)
+                    if self.cassette is not None:
+                        # Recording needs the body, so a streamed response is read whole here
+                        self.cassette.record(request, response)
+                    return response
+                # Give the connection back before waiting
+                response.raw.drain_conn()
+                response.raw.release_conn()
+                time.sleep(retry_delay(attempt, response.headers.get("Retry-After")))
+            attempt += 1
+            self.retries += 1
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        self._pool_connections = connections
+        self._pool_maxsize = maxsize
+        self._pool_block = block
+        self.poolmanager = MeteredPoolManager(num_pools=connections, maxsize=maxsize, block=block,
+                                              stats=self.connections, **pool_kwargs)
+
+    def _record_transfer(self, request, response) -> None:
+        # Session.send() reads the body right after this anyway; tell() counts encoded bytes
+        body = response.content or b""
+        wire = response.raw.tell() if hasattr(response.raw, "tell") else len(body)
+        encoding = response.headers.get("Content-Encoding", "identity")
+        self.transfer.record(route_key(request.method, request.url), wire, len(body), encoding)
+
+    def _revalidate(self, cache: HTTPCache, entry, request, response, stream: bool = False) -> Optional[CacheWriter]:
+        """Count the outcome and restore 304s; for a streamed 200, the writer to store its body with"""
+        key = route_key(request.method, request.url)
+        if entry is not None:
+            cache.stats.count(key, "revalidated")
+            if response.status_code == 304:
+                cache.stats.count(key, "hits")
+                cache.restore(entry, response)
+                return None
+            cache.stats.count(key, "misses")
+        if response.status_code != 200:
+            return None
+        if not stream:
+            cache.stats.count(key, "stored" if cache.store(request, response) else "no_validators")
+            return None
+        writer = cache.writer(request, response)
+        if writer is None:
+            cache.stats.count(key, "no_validators")
+        return writer
+
+    def build_response(self, req, resp):
+        response = super().build_response(req, resp)
+        response.__class__ = WPResponse
+        return response
+
+    def _send_governed(self, request, **kwargs):
+        self.governor.acquire()
+        start = time.monotonic()
+        status = None
+        retry_after = None
+        try:
+            response = super().send(request, **kwargs)
+            status = response.status_code
+            retry_after = response.headers.get("Retry-After")
+            return response
+        finally:
+            latency = time.monotonic() - start if status is not None else None
+            self.governor.release(status, latency, retry_after, route_key(request.method, request.url))
+
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+_original_request = requests.api.request
+
+
+def worker_count() -> int:
+    """Number of pytest-xdist workers sharing the server (1 when not distributed)"""
+    try:
+        return max(1, int(os.environ.get("PYTEST_XDIST_WORKER_COUNT", "1")))
+    except ValueError:
+        return 1
+
+
+def create_governor(rate: float = MAX_REQUESTS_PER_SECOND,
+                    max_concurrency: int = MAX_CONCURRENCY) -> Governor:
+    """Governor with this worker's share of the configured limits"""
+    workers = worker_count()
+    return Governor(rate / workers, max(1, max_concurrency // workers))
+
+
+def create_session(governor: Governor) -> requests.Session:
+    session = requests.Session()
+    # Keep the per-call semantics of requests.get(): nothing carries over between tests
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    # Offer every encoding urllib3 can decode here (br/zstd only when their packages are installed)
+    session.headers.update(make_headers(accept_encoding=True))
+    adapter = RuntimeAdapter(governor, pool_maxsize=governor.max_concurrency)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = create_session(create_governor())
+        return _session
+
+
+def get_adapter() -> RuntimeAdapter:
+    return get_session().get_adapter("http://")
+
+
+def get_governor() -> Governor:
+    return get_adapter().governor
+
+
+def get_breaker() -> CircuitBreaker:
+    return get_adapter().breaker
+
+
+def request(method, url, **kwargs):
+    """Drop-in replacement for requests.request using the shared session"""
+    return get_session().request(method=method, url=url, **kwargs)
+
+
+def install(rate: Optional[float] = None, max_concurrency: Optional[int] = None,
+            cache: Optional[HTTPCache] = None, cassette=None) -> None:
+    """Route requests.get/post/... through the shared session"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = create_session(create_governor(
+                MAX_REQUESTS_PER_SECOND if rate is None else rate,
+                MAX_CONCURRENCY if max_concurrency is None else max_concurrency,
+            ))
+    get_adapter().cache = cache
+    get_adapter().cassette = cassette
+    requests.api.request = request
+    requests.request = request
+
+
+def uninstall() -> None:
+    global _session
+    requests.api.request = _original_request
+    requests.request = _original_request
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None